@@ -0,0 +1,161 @@
+import argparse
+import json
+import platform
+import time
+
+import numpy as np
+
+from main import Direction, MazeSolver
+from maze_generator import braid, kruskal_maze
+
+
+# Larger grids (e.g. --sizes 4096) work but take a long time per case
+SIZES = (8, 64, 512)
+MODES = ('nodes', 'compact', 'bidirectional', 'jump')
+
+
+def random_maze(size, rng, density=0.3):
+    """Independent random walls at the given density"""
+    return (rng.random((size, size)) < density).astype(np.uint8)
+
+
+def corridor_maze(size, rng):
+    """Long horizontal corridors joined by one random gap per wall row"""
+    maze = np.zeros((size, size), dtype=np.uint8)
+    maze[1::2] = 1
+    gaps = rng.integers(0, size, size=maze[1::2].shape[0])
+    maze[np.arange(1, size, 2), gaps] = 0
+    return maze
+
+
+def open_field_maze(size, rng):
+    """Mostly open ground with sparse obstacles"""
+    return random_maze(size, rng, density=0.05)
+
+
+def spiral_maze(size, rng):
+    """Concentric square walls, each with a single opening on alternating sides"""
+    maze = np.zeros((size, size), dtype=np.uint8)
+    for ring, offset in enumerate(range(1, size // 2, 2)):
+        low, high = offset, size - 1 - offset
+        if high - low < 2:
+            break
+        maze[low, low:high + 1] = 1
+        maze[high, low:high + 1] = 1
+        maze[low:high + 1, low] = 1
+        maze[low:high + 1, high] = 1
+        middle = (low + high) // 2
+        if ring % 2:
+            maze[middle, low] = 0
+        else:
+            maze[middle, high] = 0
+    return maze
+
+
+def braided_maze(size, rng):
+    """Perfect maze with half of its dead ends knocked through"""
+    return braid(kruskal_maze(size, size, rng), 0.5, rng)
+
+
+GENERATORS = {
+    'random': random_maze,
+    'corridor': corridor_maze,
+    'open_field': open_field_maze,
+    'spiral': spiral_maze,
+    'braided': braided_maze,
+}
+
+
+def pick_queries(maze, rng, count):
+    """Random (start_pos, start_direction, goal_pos) triples on free cells"""
+    free = np.argwhere(maze == 0)
+    picks = rng.integers(0, len(free), size=(count, 2))
+    return [(tuple(int(v) for v in free[a]), Direction(int(rng.integers(4))), tuple(int(v) for v in free[b]))
+            for a, b in picks]
+
+
+def run_case(kind, size, mode, queries_per_case, seed, track_memory):
+    """Solve queries_per_case random queries on one generated maze.
+
+    Component labels do not depend on the goal, so they are built once per
+    maze and timed as setup, apart from the searches.
+    """
+    rng = np.random.default_rng(seed)
+    maze = GENERATORS[kind](size, rng)
+    queries = pick_queries(maze, rng, queries_per_case)
+
+    started = time.perf_counter()
+    labels = MazeSolver(maze, copy=False).component_labels()
+    setup_seconds = time.perf_counter() - started
+
+    expanded = generated = peak_bytes = solved = 0
+    phase_times = {}
+    started = time.perf_counter()
+    for start_pos, start_direction, goal_pos in queries:
+        solver = MazeSolver(maze, start_pos=start_pos, end_pos=goal_pos, copy=False, labels=labels)
+        solver.track_memory = track_memory
+        path = solver.solve(mode, start_pos, start_direction)
+        stats = solver.stats
+        solved += path is not None
+        expanded += stats.expanded
+        generated += stats.generated
+        peak_bytes = max(peak_bytes, stats.bytes_allocated)
+        for phase, seconds in stats.phase_times.items():
+            phase_times[phase] = phase_times.get(phase, 0.0) + seconds
+    elapsed = time.perf_counter() - started
+
+    return {
+        'maze': kind,
+        'size': size,
+        'mode': mode,
+        'queries': len(queries),
+        'solved': solved,
+        'setup_seconds': setup_seconds,
+        'seconds': elapsed,
+        'queries_per_second': len(queries) / elapsed if elapsed else None,
+        'expanded': expanded,
+        'expanded_per_second': expanded / elapsed if elapsed else None,
+        'generated': generated,
+        # Only compact mode sizes its arrays without tracemalloc, so the
+        # modes are comparable only when memory was traced
+        'peak_bytes': peak_bytes if track_memory else None,
+        'phase_times': phase_times,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MazeSolver search strategies on generated mazes")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)))
+    parser.add_argument("--mazes", default=",".join(GENERATORS))
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--queries", default=5, type=int, help="queries per maze/size/mode")
+    parser.add_argument("--seed", default=0, type=int)
+    parser.add_argument("--memory", action="store_true", help="record tracemalloc peaks (slower)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        for kind in args.mazes.split(","):
+            for mode in args.modes.split(","):
+                result = run_case(kind, size, mode, args.queries, args.seed, args.memory)
+                results.append(result)
+                memory = f"{result['peak_bytes'] / 1e6:.1f} MB" if args.memory else "n/a"
+                print(f"{kind:10s} {size:5d} {mode:13s} "
+                      f"{result['queries_per_second']:10.2f} q/s "
+                      f"{result['expanded_per_second']:12.0f} exp/s "
+                      f"{memory:>12s} "
+                      f"(setup {result['setup_seconds']:.3f}s)")
+
+    with open(args.output, "w") as f:
+        json.dump({
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'seed': args.seed,
+            'results': results,
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+import hashlib
+import heapq
+import math
+
+import numpy as np
+
+from main import Direction
+
+
+# (direction offset, move cost) for forward, turn_right, turn_left
+_ACTIONS = ((0, 1.0), (1, 1.1), (-1, 1.1))
+_GOAL = -1  # abstract node standing for "any facing on the goal cell"
+
+
+class HierarchicalPlanner:
+    """HPA*-style planner over square clusters of a MazeSolver's grid.
+
+    Abstract nodes are the entrance states of each cluster: a border cell
+    entered from a neighbouring cluster, facing the direction of entry.
+    For every entrance the precomputed edges hold the exact cheapest cost,
+    staying inside the cluster, of reaching each entrance state of a
+    neighbouring cluster. Because every crossing is kept, the abstract graph
+    preserves optimal costs under the forward/turn_right/turn_left model.
+
+    Queries connect the start and goal to the abstract graph, search it, and
+    refine each abstract edge with a search confined to one cluster. An
+    entrance only depends on the cells of its own cluster (the walkability
+    of the cell it crosses into is checked at query time), so changing cells
+    rebuilds just the clusters that contain them.
+    """
+
+    def __init__(self, solver, cluster_size=16, build=True):
+        self.solver = solver
+        self.cluster_size = cluster_size
+        self.rows, self.cols = solver.rows, solver.cols
+        self.deltas = [solver.direction_vectors[Direction(d)] for d in range(4)]
+        self.clusters = {}  # (cluster_row, cluster_col) -> {entrance: {target: cost}}
+        self.last_expanded = 0
+        if build:
+            self.build()
+
+    def cluster_of(self, row, col):
+        return row // self.cluster_size, col // self.cluster_size
+
+    def _bounds(self, cluster):
+        row0 = cluster[0] * self.cluster_size
+        col0 = cluster[1] * self.cluster_size
+        return row0, col0, min(row0 + self.cluster_size, self.rows), min(col0 + self.cluster_size, self.cols)
+
+    def _walkable_block(self, cluster):
+        row0, col0, row1, col1 = self._bounds(cluster)
+        return np.asarray(self.solver.maze[row0:row1, col0:col1]) == 0
+
+    def build(self):
+        """Precompute entrances and intra-cluster edges for every cluster"""
+        for cluster_row in range(math.ceil(self.rows / self.cluster_size)):
+            for cluster_col in range(math.ceil(self.cols / self.cluster_size)):
+                self.build_cluster((cluster_row, cluster_col))
+
+    def build_cluster(self, cluster):
+        """(Re)compute the entrances and outgoing edges of one cluster"""
+        row0, col0, row1, col1 = self._bounds(cluster)
+        walkable = self._walkable_block(cluster)
+        edges = {}
+        for entrance in self._entrances(cluster, walkable):
+            _, _, exits = self._search_cluster(cluster, walkable, {entrance: 0.0})
+            edges[entrance] = {target: cost for target, (cost, _) in exits.items()}
+        self.clusters[cluster] = edges
+
+    def _entrances(self, cluster, walkable):
+        """Walkable border states of a cluster that are entered from outside it"""
+        row0, col0, row1, col1 = self._bounds(cluster)
+        border = set()
+        for row in range(row0, row1):
+            border.update(((row, col0), (row, col1 - 1)))
+        for col in range(col0, col1):
+            border.update(((row0, col), (row1 - 1, col)))
+
+        entrances = []
+        for row, col in sorted(border):
+            if not walkable[row - row0, col - col0]:
+                continue
+            for direction, (d_row, d_col) in enumerate(self.deltas):
+                prev_row, prev_col = row - d_row, col - d_col
+                inside = row0 <= prev_row < row1 and col0 <= prev_col < col1
+                if not inside and 0 <= prev_row < self.rows and 0 <= prev_col < self.cols:
+                    entrances.append((row * self.cols + col) * 4 + direction)
+        return entrances
+
+    def _search_cluster(self, cluster, walkable, sources, goal_cell=None):
+        """Dijkstra from {state: cost} over states inside a cluster.
+
+        Returns (g, parent, exits): exits maps each state just outside the
+        cluster to (cost, inside state it was entered from). Exit targets are
+        not checked for walkability. Stops early once goal_cell is settled.
+        """
+        row0, col0, row1, col1 = self._bounds(cluster)
+        g = dict(sources)
+        parent = {state: None for state in sources}
+        exits = {}
+        heap = [(cost, state) for state, cost in sources.items()]
+        heapq.heapify(heap)
+        closed = set()
+        while heap:
+            cost, state = heapq.heappop(heap)
+            if state in closed:
+                continue
+            closed.add(state)
+            cell, direction = divmod(state, 4)
+            if cell == goal_cell:
+                break
+            row, col = divmod(cell, self.cols)
+            for offset, move_cost in _ACTIONS:
+                new_direction = (direction + offset) % 4
+                d_row, d_col = self.deltas[new_direction]
+                new_row, new_col = row + d_row, col + d_col
+                if not (0 <= new_row < self.rows and 0 <= new_col < self.cols):
+                    continue
+                new_state = (new_row * self.cols + new_col) * 4 + new_direction
+                new_cost = cost + move_cost
+                if not (row0 <= new_row < row1 and col0 <= new_col < col1):
+                    if new_cost < exits.get(new_state, (math.inf,))[0]:
+                        exits[new_state] = (new_cost, state)
+                    continue
+                if not walkable[new_row - row0, new_col - col0]:
+                    continue
+                if new_cost < g.get(new_state, math.inf):
+                    g[new_state] = new_cost
+                    parent[new_state] = state
+                    heapq.heappush(heap, (new_cost, new_state))
+        return g, parent, exits
+
+    def _goal_distances(self, cluster, walkable, goal_cell):
+        """Cheapest in-cluster cost from each state of a cluster to goal_cell"""
+        row0, col0, row1, col1 = self._bounds(cluster)
+        dist = {goal_cell * 4 + direction: 0.0 for direction in range(4)}
+        heap = [(0.0, state) for state in dist]
+        while heap:
+            cost, state = heapq.heappop(heap)
+            if cost > dist[state]:
+                continue
+            cell, direction = divmod(state, 4)
+            row, col = divmod(cell, self.cols)
+            d_row, d_col = self.deltas[direction]
+            prev_row, prev_col = row - d_row, col - d_col
+            if not (row0 <= prev_row < row1 and col0 <= prev_col < col1):
+                continue
+            prev_cell = prev_row * self.cols + prev_col
+            if not walkable[prev_row - row0, prev_col - col0] or prev_cell == goal_cell:
+                continue
+            for offset, move_cost in ((0, 1.0), (-1, 1.1), (1, 1.1)):
+                prev_state = prev_cell * 4 + (direction + offset) % 4
+                if cost + move_cost < dist.get(prev_state, math.inf):
+                    dist[prev_state] = cost + move_cost
+                    heapq.heappush(heap, (cost + move_cost, prev_state))
+        return dist
+
+    def solve(self, start_pos=None, start_direction=Direction.NORTH, goal_pos=None):
+        """Optimal path from a start state to goal_pos via the abstract graph.
+
+        Defaults to the solver's start_pos and end_pos. Returns a path in the
+        same (position, Direction) format as MazeSolver.solve, or None.
+        self.last_expanded holds the number of abstract nodes expanded.
+        """
+        solver = self.solver
+        start_pos = tuple(start_pos) if start_pos is not None else solver.start_pos
+        goal_pos = tuple(goal_pos) if goal_pos is not None else solver.end_pos
+        self.last_expanded = 0
+        if not (solver.is_valid_position(start_pos) and solver.is_valid_position(goal_pos)):
+            return None
+
+        start_state = (start_pos[0] * self.cols + start_pos[1]) * 4 + start_direction.value
+        goal_cell = goal_pos[0] * self.cols + goal_pos[1]
+        start_cluster = self.cluster_of(*start_pos)
+        goal_cluster = self.cluster_of(*goal_pos)
+        goal_walkable = self._walkable_block(goal_cluster)
+        goal_dist = self._goal_distances(goal_cluster, goal_walkable, goal_cell)
+
+        def neighbours(state):
+            if state == start_state:
+                walkable = self._walkable_block(start_cluster)
+                g, _, exits = self._search_cluster(start_cluster, walkable, {start_state: 0.0})
+                if start_cluster == goal_cluster:
+                    reached = [g[s] for s in range(goal_cell * 4, goal_cell * 4 + 4) if s in g]
+                    if reached:
+                        yield _GOAL, min(reached)
+                edges = {target: cost for target, (cost, _) in exits.items()}
+            else:
+                cluster = self.cluster_of(*divmod(state >> 2, self.cols))
+                edges = self.clusters[cluster].get(state, {})
+                if cluster == goal_cluster and state in goal_dist:
+                    yield _GOAL, goal_dist[state]
+            for target, cost in edges.items():
+                if solver.is_valid_position(divmod(target >> 2, self.cols)):
+                    yield target, cost
+
+        def heuristic(state):
+            row, col = divmod(state >> 2, self.cols)
+            return math.hypot(row - goal_pos[0], col - goal_pos[1])
+
+        g = {start_state: 0.0}
+        parent = {start_state: None}
+        heap = [(heuristic(start_state), start_state)]
+        closed = set()
+        while heap:
+            _, state = heapq.heappop(heap)
+            if state in closed:
+                continue
+            closed.add(state)
+            self.last_expanded += 1
+            if state == _GOAL:
+                return self._refine(self._abstract_path(parent), goal_cell)
+            for target, cost in neighbours(state):
+                new_g = g[state] + cost
+                if new_g < g.get(target, math.inf):
+                    g[target] = new_g
+                    parent[target] = state
+                    heapq.heappush(heap, (new_g + (0.0 if target == _GOAL else heuristic(target)), target))
+        return None
+
+    def _abstract_path(self, parent):
+        nodes = []
+        node = _GOAL
+        while node is not None:
+            nodes.append(node)
+            node = parent[node]
+        nodes.reverse()
+        return nodes
+
+    def _refine(self, nodes, goal_cell):
+        """Expand abstract edges into full state sequences, one cluster at a time"""
+        states = [nodes[0]]
+        for source, target in zip(nodes, nodes[1:]):
+            cluster = self.cluster_of(*divmod(source >> 2, self.cols))
+            walkable = self._walkable_block(cluster)
+            if target == _GOAL:
+                g, parent, _ = self._search_cluster(cluster, walkable, {source: 0.0}, goal_cell=goal_cell)
+                end = min((s for s in range(goal_cell * 4, goal_cell * 4 + 4) if s in g), key=g.get)
+            else:
+                _, parent, exits = self._search_cluster(cluster, walkable, {source: 0.0})
+                end = exits[target][1]
+            segment = []
+            while end != source:
+                segment.append(end)
+                end = parent[end]
+            states.extend(reversed(segment))
+            if target != _GOAL:
+                states.append(target)
+        return self.solver._states_to_path(states)
+
+    def update_cells(self, changes):
+        """Apply cell changes through the solver and rebuild only the touched clusters"""
+        changed = self.solver.update_cells(changes)
+        for cluster in {self.cluster_of(row, col) for row, col in changed}:
+            self.build_cluster(cluster)
+        return changed
+
+    def _grid_digest(self):
+        digest = hashlib.blake2b(digest_size=16)
+        for row in range(0, self.rows, 1024):
+            digest.update(np.ascontiguousarray(self.solver.maze[row:row + 1024, 0:self.cols], dtype=np.uint8).tobytes())
+        return digest.hexdigest()
+
+    def save(self, path):
+        """Write the abstraction so it only has to be built once per map.
+
+        The file is a NumPy .npz of plain number arrays (clusters, their
+        entrances, and one row per edge), so load() never unpickles anything.
+        """
+        clusters, entrances, edges = [], [], []
+        for cluster, cluster_edges in self.clusters.items():
+            for entrance, targets in cluster_edges.items():
+                edges.extend((len(entrances), target, cost) for target, cost in targets.items())
+                entrances.append((len(clusters), entrance))
+            clusters.append(cluster)
+        edge_entrances, edge_targets, edge_costs = zip(*edges) if edges else ((), (), ())
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                shape=np.array((self.rows, self.cols)),
+                cluster_size=np.array(self.cluster_size),
+                digest=np.array(self._grid_digest()),
+                clusters=np.array(clusters, dtype=np.int64).reshape(-1, 2),
+                entrances=np.array(entrances, dtype=np.int64).reshape(-1, 2),
+                edge_entrances=np.array(edge_entrances, dtype=np.int64),
+                edge_targets=np.array(edge_targets, dtype=np.int64),
+                edge_costs=np.array(edge_costs, dtype=np.float64),
+            )
+
+    @classmethod
+    def load(cls, solver, path):
+        """Load an abstraction saved by save(); the solver's grid must match it"""
+        with np.load(path, allow_pickle=False) as data:
+            shape = tuple(data['shape'].tolist())
+            cluster_size = int(data['cluster_size'])
+            digest = str(data['digest'])
+            clusters = [tuple(cluster) for cluster in data['clusters'].tolist()]
+            entrances = data['entrances'].tolist()
+            edges = zip(data['edge_entrances'].tolist(), data['edge_targets'].tolist(),
+                        data['edge_costs'].tolist())
+            planner = cls(solver, cluster_size=cluster_size, build=False)
+            if shape != (planner.rows, planner.cols) or digest != planner._grid_digest():
+                raise ValueError(f"{path} was built for a different maze")
+            planner.clusters = {cluster: {} for cluster in clusters}
+            targets = []
+            for cluster_index, entrance in entrances:
+                targets.append(planner.clusters[clusters[cluster_index]].setdefault(entrance, {}))
+            for entrance_index, target, cost in edges:
+                targets[entrance_index][target] = cost
+        return planner
@@ -0,0 +1,209 @@
+import heapq
+import math
+
+import numpy as np
+
+from main import Direction, MazeSolver
+
+
+class IncrementalPlanner(MazeSolver):
+    """D* Lite replanner over the turn-constrained (position, direction) states.
+
+    The search runs backward from the goal cell and keeps its g/rhs values
+    between calls, so after update_cells() only states whose cost-to-go is
+    affected by the changed cells are repaired by the next replan(). The
+    agent may also move between replans by passing a new start state.
+    """
+
+    def __init__(self, maze, start_pos=(0, 7), end_pos=(6, 0), start_direction=Direction.NORTH,
+                 copy=True, verbose=False):
+        super().__init__(maze, start_pos=start_pos, end_pos=end_pos, copy=copy, verbose=verbose)
+        self.start_direction = start_direction
+
+        self._walkable = (self.maze == 0).ravel()
+        self._end_cell = self.end_pos[0] * self.cols + self.end_pos[1]
+        self._g = {}
+        self._rhs = {}
+        self._open = []  # heap of (k1, k2, state), stale entries skipped
+        self._open_keys = {}  # state -> live key
+        self._km = 0.0
+        self._last_start = None
+
+        for direction in range(4):
+            goal_state = self._end_cell * 4 + direction
+            if self._walkable[self._end_cell]:
+                self._rhs[goal_state] = 0.0
+                self._push(goal_state)
+
+    def _state(self, position, direction):
+        return (position[0] * self.cols + position[1]) * 4 + direction.value
+
+    def _start_h(self, state):
+        """Distance from the current start cell, admissible for start -> state"""
+        row, col = divmod(state >> 2, self.cols)
+        return math.hypot(row - self.start_pos[0], col - self.start_pos[1])
+
+    def _key(self, state):
+        best = min(self._g.get(state, math.inf), self._rhs.get(state, math.inf))
+        return (best + self._start_h(state) + self._km, best)
+
+    def _push(self, state):
+        key = self._key(state)
+        self._open_keys[state] = key
+        heapq.heappush(self._open, (key[0], key[1], state))
+
+    def _top(self):
+        """Drop stale heap entries and return the live (key, state) on top"""
+        while self._open:
+            k1, k2, state = self._open[0]
+            if self._open_keys.get(state) == (k1, k2):
+                return (k1, k2), state
+            heapq.heappop(self._open)
+        return (math.inf, math.inf), None
+
+    def _successors_of(self, state):
+        if not self._walkable[state >> 2]:
+            return ()
+        return self._successors(state, self._walkable)
+
+    def _predecessors_of(self, state):
+        """States with an edge into state, ignoring the walkability of state itself"""
+        return self._predecessors(state, self._walkable)
+
+    def _update_state(self, state):
+        if state >> 2 != self._end_cell:
+            self._rhs[state] = min(
+                (cost + self._g.get(succ, math.inf) for succ, cost in self._successors_of(state)),
+                default=math.inf
+            )
+        elif not self._walkable[self._end_cell]:
+            self._rhs[state] = math.inf
+
+        if self._g.get(state, math.inf) != self._rhs.get(state, math.inf):
+            self._push(state)
+        else:
+            self._open_keys.pop(state, None)
+
+    def update_cells(self, changes):
+        """Apply (row, col, value) changes and queue the affected states for repair"""
+        changed = super().update_cells(changes)
+        for row, col in changed:
+            cell = row * self.cols + col
+            self._walkable[cell] = self.maze[row, col] == 0
+            if cell == self._end_cell and self._walkable[cell]:
+                for direction in range(4):
+                    self._rhs[cell * 4 + direction] = 0.0
+
+            # States in the cell lose/gain their outgoing edges, and states
+            # that step into the cell lose/gain an edge.
+            affected = set()
+            for direction in range(4):
+                state = cell * 4 + direction
+                affected.add(state)
+                d_row, d_col = self.direction_vectors[Direction(direction)]
+                prev_row, prev_col = row - d_row, col - d_col
+                if 0 <= prev_row < self.rows and 0 <= prev_col < self.cols:
+                    prev_cell = prev_row * self.cols + prev_col
+                    for offset in (0, -1, 1):
+                        affected.add(prev_cell * 4 + (direction + offset) % 4)
+            for state in affected:
+                self._update_state(state)
+        return changed
+
+    def _compute_shortest_path(self, start_state):
+        expanded = 0
+        while True:
+            top_key, state = self._top()
+            start_g = self._g.get(start_state, math.inf)
+            start_rhs = self._rhs.get(start_state, math.inf)
+            if state is None or (top_key >= self._key(start_state) and start_rhs == start_g):
+                break
+
+            expanded += 1
+            new_key = self._key(state)
+            g_state = self._g.get(state, math.inf)
+            rhs_state = self._rhs.get(state, math.inf)
+            if top_key < new_key:
+                self._push(state)
+            elif g_state > rhs_state:
+                self._g[state] = rhs_state
+                del self._open_keys[state]
+                for pred, _ in self._predecessors_of(state):
+                    self._update_state(pred)
+            else:
+                self._g[state] = math.inf
+                self._update_state(state)
+                for pred, _ in self._predecessors_of(state):
+                    self._update_state(pred)
+        return expanded
+
+    def replan(self, start_pos=None, start_direction=None):
+        """Return an optimal path from the (optionally new) start state.
+
+        Reuses the search state from earlier calls; only states made
+        inconsistent by update_cells() or by moving the start are expanded.
+        Counters are recorded in self.stats and self.last_expanded.
+        """
+        stats = self._start_stats('incremental')
+        if start_pos is not None:
+            self.start_pos = tuple(start_pos)
+        if start_direction is not None:
+            self.start_direction = start_direction
+
+        if self._last_start is not None and self._last_start != self.start_pos:
+            # D* Lite key modifier: heuristics shrink by at most this much
+            self._km += math.hypot(self._last_start[0] - self.start_pos[0],
+                                   self._last_start[1] - self.start_pos[1])
+        self._last_start = self.start_pos
+
+        start_state = self._state(self.start_pos, self.start_direction)
+        stats.end_phase('setup')
+        expanded = self._compute_shortest_path(start_state)
+        stats.end_phase('search')
+        self._log(f"Replanned with {expanded} expansions")
+
+        if not self._walkable[start_state >> 2] or self._g.get(start_state, math.inf) == math.inf:
+            self._log("No path found!")
+            return self._finish_stats(stats, None, expanded)
+
+        # Follow the cheapest successor until the goal cell is reached
+        states = [start_state]
+        state = start_state
+        for _ in range(self.rows * self.cols * 4):
+            if state >> 2 == self._end_cell:
+                return self._finish_stats(stats, self._states_to_path(states), expanded)
+            state = min(self._successors_of(state),
+                        key=lambda succ: succ[1] + self._g.get(succ[0], math.inf))[0]
+            states.append(state)
+        self._log("No path found!")
+        return self._finish_stats(stats, None, expanded)
+
+    def solve(self, mode='incremental', start_pos=None, start_direction=None):
+        """Solve via replan() by default; other modes defer to MazeSolver.solve.
+
+        start_direction defaults to the planner's own start_direction.
+        """
+        if mode == 'incremental':
+            return self.replan(start_pos, start_direction)
+        if start_direction is None:
+            start_direction = self.start_direction
+        return super().solve(mode, start_pos, start_direction)
+
+
+if __name__ == "__main__":
+    maze = np.array([
+        [0, 0, 0, 1, 0, 0, 0, 0],
+        [1, 1, 0, 1, 1, 0, 1, 0],
+        [0, 0, 0, 0, 0, 0, 1, 0],
+        [0, 1, 1, 1, 1, 0, 1, 1],
+        [0, 0, 0, 0, 1, 0, 0, 0],
+        [1, 1, 1, 0, 1, 1, 1, 1],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [1, 1, 1, 1, 1, 1, 1, 0]
+    ])
+    planner = IncrementalPlanner(maze, verbose=True)
+    planner.print_solution_steps(planner.replan())
+
+    # Open the wall between the two top corridors and repair the plan
+    planner.update_cells([(0, 3, 0)])
+    planner.print_solution_steps(planner.replan())
@@ -1,9 +1,20 @@
 import heapq
-import matplotlib.pyplot as plt
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
 import numpy as np
 from enum import Enum
-import turtle
 import time
+import tracemalloc
+
+from maze_io import PackedMaze, load_maze
+
+try:
+    from scipy import ndimage
+except ImportError:  # scipy is optional; component labelling falls back to BFS
+    ndimage = None
 
 class Direction(Enum):
     NORTH = 0
@@ -29,10 +40,103 @@ class MazeNode:
     def __hash__(self):
         return hash((self.position, self.direction))
 
+class OpenSet:
+    """Priority queue of MazeNodes indexed by (position, direction).
+
+    Backed by a binary heap plus a dict index. Lowering a node's cost pushes a
+    fresh entry and marks the old one stale (lazy deletion), so push, pop and
+    decrease-key are all O(log n) and the heap invariant is never broken.
+    """
+    def __init__(self):
+        self._heap = []
+        self._index = {}  # (position, direction) -> live MazeNode
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def get(self, key):
+        """Return the live node for a (position, direction) key, or None"""
+        return self._index.get(key)
+
+    def push(self, node):
+        """Insert a node, replacing any existing entry for the same state"""
+        self._index[(node.position, node.direction)] = node
+        heapq.heappush(self._heap, node)
+
+    def decrease_key(self, node, g_cost, parent):
+        """Lower the g_cost of a queued state and re-prioritise it"""
+        updated = MazeNode(node.position, node.direction,
+                           g_cost=g_cost, h_cost=node.h_cost, parent=parent)
+        self.push(updated)
+        return updated
+
+    def pop(self):
+        """Remove and return the live node with the lowest f_cost"""
+        while self._heap:
+            node = heapq.heappop(self._heap)
+            key = (node.position, node.direction)
+            if self._index.get(key) is node:
+                del self._index[key]
+                return node
+        raise IndexError("pop from an empty OpenSet")
+
+class SearchStats:
+    """Counters and phase timings recorded for one MazeSolver search.
+
+    bytes_allocated is the size of the preallocated state arrays in compact
+    mode, or the tracemalloc peak of the whole search when the solver's
+    track_memory flag is set.
+    """
+    def __init__(self, mode):
+        self.mode = mode
+        self.expanded = 0
+        self.generated = 0
+        self.reopened = 0
+        self.peak_open = 0
+        self.bytes_allocated = 0
+        self.path_length = 0
+        self.phase_times = {}  # 'setup', 'search', 'reconstruct' -> seconds
+        self._mark = time.perf_counter()
+
+    def end_phase(self, name):
+        """Charge the time since the previous phase ended to name"""
+        now = time.perf_counter()
+        self.phase_times[name] = self.phase_times.get(name, 0.0) + now - self._mark
+        self._mark = now
+
+    @property
+    def total_time(self):
+        return sum(self.phase_times.values())
+
+    def as_dict(self):
+        return {
+            'mode': self.mode,
+            'expanded': self.expanded,
+            'generated': self.generated,
+            'reopened': self.reopened,
+            'peak_open': self.peak_open,
+            'bytes_allocated': self.bytes_allocated,
+            'path_length': self.path_length,
+            'phase_times': dict(self.phase_times),
+            'total_time': self.total_time,
+        }
+
 class MazeSolver:
-    def __init__(self, maze):
-        self.maze = np.array(maze)
+    def __init__(self, maze, start_pos=(0, 7), end_pos=(6, 0), copy=True, verbose=False, labels=None):
+        # copy=False wraps an existing array (e.g. a shared-memory buffer or a
+        # memory-mapped file) as-is; a copy is stored as one byte per cell
+        if copy:
+            self.maze = np.array(maze, dtype=np.uint8)
+        elif isinstance(maze, PackedMaze):
+            self.maze = maze
+        else:
+            self.maze = np.asanyarray(maze)
         self.rows, self.cols = self.maze.shape
+        # Mapped grids may exceed RAM, so whole-grid fields are never built implicitly
+        self._mapped = isinstance(self.maze, (np.memmap, PackedMaze))
 
         # Direction vectors: North, East, South, West
         self.direction_vectors = {
@@ -43,12 +147,66 @@ class MazeSolver:
         }
 
         # Start from bottom right corner as specified
-        self.start_pos = (0, 7)
+        self.start_pos = tuple(start_pos)
         # End at top left corner (can be modified as needed)
-        self.end_pos = (6, 0)
-
-        print(f"Start position: {self.start_pos}")
-        print(f"End position: {self.end_pos}")
+        self.end_pos = tuple(end_pos)
+        self.verbose = verbose
+
+        # Goal-dependent fields, built on first use and reused by every query
+        self._h_field = None
+        self._exact_h = None
+        # Component labels do not depend on the goal, so solvers over the same
+        # grid can share one precomputed array (labels=)
+        self._labels = labels
+
+        # Number of states expanded by the most recent solve, for comparing strategies
+        self.last_expanded = 0
+        # SearchStats of the most recent solve; each listener is called with it
+        self.stats = None
+        self.listeners = []
+        # Measure tracemalloc peak per search (slows searches down noticeably)
+        self.track_memory = False
+        # Bumped by update_cells whenever the grid actually changes
+        self.maze_version = 0
+
+        self._log(f"Start position: {self.start_pos}")
+        self._log(f"End position: {self.end_pos}")
+
+    @classmethod
+    def from_file(cls, path, writable=False, **kwargs):
+        """Create a solver over a memory-mapped .npy or bit-packed maze file"""
+        return cls(load_maze(path, writable=writable), copy=False, **kwargs)
+
+    def _log(self, message):
+        """Print search progress when the solver is verbose"""
+        if self.verbose:
+            print(message)
+
+    def _start_stats(self, mode):
+        stats = SearchStats(mode)
+        self.stats = stats
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            stats._memory_base = tracemalloc.get_traced_memory()[0]
+        return stats
+
+    def _finish_stats(self, stats, path, expanded=0, generated=0, reopened=0, peak_open=0):
+        """Record the final counters, notify listeners and pass the path through"""
+        if path is not None:
+            stats.end_phase('reconstruct')
+            stats.path_length = len(path)
+        stats.expanded = expanded
+        stats.generated = generated
+        stats.reopened = reopened
+        stats.peak_open = peak_open
+        if self.track_memory:
+            stats.bytes_allocated = tracemalloc.get_traced_memory()[1] - stats._memory_base
+        self.last_expanded = expanded
+        for listener in self.listeners:
+            listener(stats)
+        return path
 
     def is_valid_position(self, position):
         """Check if position is within bounds and walkable"""
@@ -57,6 +215,24 @@ class MazeSolver:
                 0 <= col < self.cols and 
                 self.maze[row, col] == 0)
 
+    def update_cells(self, changes):
+        """Apply (row, col, value) cell changes to the maze.
+
+        Goal fields that depend on walls (exact heuristic, component labels)
+        are dropped until they are built again. Returns the (row, col) cells
+        whose value actually changed.
+        """
+        changed = []
+        for row, col, value in changes:
+            if self.maze[row, col] != value:
+                self.maze[row, col] = value
+                changed.append((row, col))
+        if changed:
+            self.maze_version += 1
+            self._exact_h = None
+            self._labels = None
+        return changed
+
     def euclidean_distance(self, pos1, pos2):
         """Heuristic function - Euclidean distance"""
         return np.sqrt((pos1[0] - pos2[0])**2 + (pos1[1] - pos2[1])**2)
@@ -93,40 +269,71 @@ class MazeSolver:
 
         return actions
 
-    def solve(self):
-        """Solve maze using A* algorithm with movement constraints"""
-        # Initialize with agent facing North
+    def solve(self, mode='nodes', start_pos=None, start_direction=Direction.NORTH):
+        """Solve maze using A* algorithm with movement constraints
+
+        mode selects the search strategy: 'nodes' expands MazeNode objects,
+        'compact' runs over preallocated NumPy state arrays (see solve_compact),
+        'bidirectional' searches from both ends (see solve_bidirectional) and
+        'jump' collapses forward-only corridors (see solve_jump). All return
+        an optimal path; self.stats holds the SearchStats of the run and
+        self.last_expanded its expansion count.
+        start_pos defaults to self.start_pos; the goal is always self.end_pos.
+        """
+        if mode == 'compact':
+            return self.solve_compact(start_pos, start_direction)
+        if mode == 'bidirectional':
+            return self.solve_bidirectional(start_pos, start_direction)
+        if mode == 'jump':
+            return self.solve_jump(start_pos, start_direction)
+        if mode != 'nodes':
+            raise ValueError(f"Unknown solve mode: {mode!r}")
+
+        if start_pos is None:
+            start_pos = self.start_pos
+        stats = self._start_stats('nodes')
+        if not self.is_reachable(start_pos, start_direction):
+            self._log("No path found!")
+            return self._finish_stats(stats, None)
+
+        # Initialize with agent facing start_direction (North by default)
         start_node = MazeNode(
-            position=self.start_pos,
-            direction=Direction.NORTH,
+            position=start_pos,
+            direction=start_direction,
             g_cost=0,
-            h_cost=self.euclidean_distance(self.start_pos, self.end_pos)
+            h_cost=self.heuristic(start_pos, start_direction)
         )
 
-        open_list = [start_node]
+        open_set = OpenSet()
+        open_set.push(start_node)
         closed_set = set()
 
         step_count = 0
+        generated = peak_open = 1
+        reopened = 0
+        stats.end_phase('setup')
 
-        print("\nStarting A* maze solving with movement constraints...")
-        print(f"Initial state: Position {start_node.position}, Direction {start_node.direction.name}")
+        self._log("\nStarting A* maze solving with movement constraints...")
+        self._log(f"Initial state: Position {start_node.position}, Direction {start_node.direction.name}")
 
-        while open_list:
+        while open_set:
             # Get node with lowest f_cost
-            current_node = heapq.heappop(open_list)
+            current_node = open_set.pop()
 
             # Add to closed set
             closed_set.add(current_node)
 
             step_count += 1
-            if step_count <= 20 or step_count % 50 == 0:
-                print(f"Step {step_count}: Exploring position {current_node.position}, "
-                      f"direction {current_node.direction.name}, f_cost: {current_node.f_cost:.2f}")
+            if self.verbose and (step_count <= 20 or step_count % 50 == 0):
+                self._log(f"Step {step_count}: Exploring position {current_node.position}, "
+                          f"direction {current_node.direction.name}, f_cost: {current_node.f_cost:.2f}")
 
             # Check if we reached the goal
             if current_node.position == self.end_pos:
-                print(f"\n*** GOAL REACHED in {step_count} exploration steps! ***")
-                return self.reconstruct_path(current_node)
+                self._log(f"\n*** GOAL REACHED in {step_count} exploration steps! ***")
+                stats.end_phase('search')
+                return self._finish_stats(stats, self.reconstruct_path(current_node),
+                                          step_count, generated, reopened, peak_open)
 
             # Explore possible actions
             possible_actions = self.get_possible_actions(current_node)
@@ -149,28 +356,547 @@ class MazeSolver:
                     move_cost = 1.1
 
                 new_g_cost = current_node.g_cost + move_cost
-                new_h_cost = self.euclidean_distance(new_position, self.end_pos)
+                new_h_cost = self.heuristic(new_position, new_direction)
 
                 new_node.g_cost = new_g_cost
                 new_node.h_cost = new_h_cost
                 new_node.f_cost = new_g_cost + new_h_cost
 
                 # Check if this path to the node is better
-                existing_node = None
-                for node in open_list:
-                    if node == new_node:
-                        existing_node = node
-                        break
+                existing_node = open_set.get((new_position, new_direction))
 
                 if existing_node is None:
-                    heapq.heappush(open_list, new_node)
+                    open_set.push(new_node)
+                    generated += 1
+                    if len(open_set) > peak_open:
+                        peak_open = len(open_set)
                 elif new_g_cost < existing_node.g_cost:
-                    existing_node.g_cost = new_g_cost
-                    existing_node.f_cost = new_g_cost + existing_node.h_cost
-                    existing_node.parent = current_node
+                    open_set.decrease_key(existing_node, new_g_cost, current_node)
+                    reopened += 1
+
+        self._log("No path found!")
+        stats.end_phase('search')
+        return self._finish_stats(stats, None, step_count, generated, reopened, peak_open)
+
+    def heuristic_field(self):
+        """Euclidean distance to end_pos for every cell, computed once per solver"""
+        if self._h_field is None:
+            row_idx, col_idx = np.indices((self.rows, self.cols))
+            self._h_field = np.hypot(row_idx - self.end_pos[0], col_idx - self.end_pos[1])
+        return self._h_field
+
+    def heuristic(self, position, direction):
+        """Heuristic for one state: exact cost-to-go if built, else Euclidean"""
+        if self._exact_h is not None:
+            return float(self._exact_h[position[0], position[1], direction.value])
+        if self._h_field is None and self._mapped:
+            return math.hypot(position[0] - self.end_pos[0], position[1] - self.end_pos[1])
+        return float(self.heuristic_field()[position])
+
+    def build_exact_heuristic(self):
+        """Exact cost-to-go to end_pos for every (row, col, direction) state.
+
+        Runs one reverse Dijkstra from the goal cell over the turn-constrained
+        state space, so later searches against the same goal use a perfect
+        heuristic. Unreachable states are np.inf. Returns the (rows, cols, 4)
+        array and makes solve()/solve_compact() use it.
+        """
+        rows, cols = self.rows, self.cols
+        dist = np.full(rows * cols * 4, np.inf)
+        walkable = (self.maze == 0).ravel()
+        deltas = [self.direction_vectors[Direction(d)] for d in range(4)]
+
+        end_cell = self.end_pos[0] * cols + self.end_pos[1]
+        heap = []
+        if walkable[end_cell]:
+            for direction in range(4):
+                dist[end_cell * 4 + direction] = 0.0
+                heap.append((0.0, end_cell * 4 + direction))
+
+        # A state (cell, d) is entered from cell - delta[d] facing d (forward),
+        # d - 1 (turned right) or d + 1 (turned left).
+        predecessors = ((0, 1.0), (-1, 1.1), (1, 1.1))
+        while heap:
+            cost, state = heapq.heappop(heap)
+            if cost > dist[state]:
+                continue
+            cell, direction = divmod(state, 4)
+            row, col = divmod(cell, cols)
+            d_row, d_col = deltas[direction]
+            prev_row, prev_col = row - d_row, col - d_col
+            if not (0 <= prev_row < rows and 0 <= prev_col < cols):
+                continue
+            prev_cell = prev_row * cols + prev_col
+            if not walkable[prev_cell] or prev_cell == end_cell:
+                continue
+            for offset, move_cost in predecessors:
+                prev_state = prev_cell * 4 + (direction + offset) % 4
+                new_cost = cost + move_cost
+                if new_cost < dist[prev_state]:
+                    dist[prev_state] = new_cost
+                    heapq.heappush(heap, (new_cost, prev_state))
+
+        self._exact_h = dist.reshape(rows, cols, 4)
+        return self._exact_h
+
+    def component_labels(self):
+        """Label 4-connected components of walkable cells (0 marks walls).
+
+        Only built on request (or passed in as labels=): without scipy it is a
+        pure-Python pass over the whole grid, far slower than most searches.
+        """
+        if self._labels is not None:
+            return self._labels
+
+        walkable = self.maze == 0
+        if ndimage is not None:
+            labels, _ = ndimage.label(walkable)
+        else:
+            labels = np.zeros((self.rows, self.cols), dtype=np.int32)
+            next_label = 0
+            for start in zip(*np.nonzero(walkable)):
+                if labels[start]:
+                    continue
+                next_label += 1
+                labels[start] = next_label
+                queue = deque([start])
+                while queue:
+                    row, col = queue.popleft()
+                    for d_row, d_col in self.direction_vectors.values():
+                        nr, nc = row + d_row, col + d_col
+                        if (0 <= nr < self.rows and 0 <= nc < self.cols
+                                and walkable[nr, nc] and not labels[nr, nc]):
+                            labels[nr, nc] = next_label
+                            queue.append((nr, nc))
+        self._labels = labels
+        return labels
+
+    def is_reachable(self, start_pos, start_direction=Direction.NORTH):
+        """O(1) check that end_pos can possibly be reached from a start state.
+
+        Exact when build_exact_heuristic() has run; with component_labels()
+        built it rejects starts in a different connected component than the
+        goal; otherwise it only checks that both end cells are walkable.
+        """
+        if not (0 <= start_pos[0] < self.rows and 0 <= start_pos[1] < self.cols):
+            return False
+        if self._exact_h is not None:
+            return bool(np.isfinite(self._exact_h[start_pos[0], start_pos[1], start_direction.value]))
+        if self._labels is None:
+            return self.is_valid_position(start_pos) and self.is_valid_position(self.end_pos)
+        labels = self._labels
+        start_label = labels[start_pos]
+        return bool(start_label) and start_label == labels[self.end_pos]
+
+    def solve_compact(self, start_pos=None, start_direction=Direction.NORTH):
+        """A* over (row, col, direction) states held in preallocated arrays.
+
+        Same action model and costs as solve(), but g-costs, parent pointers and
+        closed flags live in NumPy arrays shaped (rows, cols, 4) and directions
+        are encoded as Direction.value. A state is the flat index
+        (row * cols + col) * 4 + direction. MazeNode objects are only built for
+        the returned path.
+        """
+        if start_pos is None:
+            start_pos = self.start_pos
+        stats = self._start_stats('compact')
+        if not self.is_reachable(start_pos, start_direction):
+            self._log("No path found!")
+            return self._finish_stats(stats, None)
+
+        rows, cols = self.rows, self.cols
+        n_states = rows * cols * 4
+
+        g_cost = np.full(n_states, np.inf)
+        parent = np.full(n_states, -1, dtype=np.int64 if n_states > 2**31 - 1 else np.int32)
+        closed = np.zeros(n_states, dtype=bool)
+        walkable = (self.maze == 0).ravel()
+        # Heuristic is indexed by state >> h_shift: per cell (Euclidean) or per state (exact)
+        if self._exact_h is not None:
+            h_field, h_shift = self._exact_h.reshape(-1), 0
+        else:
+            h_field, h_shift = self.heuristic_field().ravel(), 2
+
+        # Deltas indexed by Direction.value
+        deltas = [self.direction_vectors[Direction(d)] for d in range(4)]
+        # (direction offset, move cost) in get_possible_actions order
+        actions = ((0, 1.0), (1, 1.1), (-1, 1.1))
+
+        start_row, start_col = start_pos
+        end_cell = self.end_pos[0] * cols + self.end_pos[1]
+        start_state = (start_row * cols + start_col) * 4 + start_direction.value
+        g_cost[start_state] = 0.0
+        open_heap = [(float(h_field[start_state >> h_shift]), start_state)]
+
+        step_count = 0
+        generated = peak_open = 1
+        reopened = 0
+        stats.bytes_allocated = g_cost.nbytes + parent.nbytes + closed.nbytes + walkable.nbytes
+        stats.end_phase('setup')
+        self._log("\nStarting compact A* maze solving with movement constraints...")
+
+        while open_heap:
+            _, state = heapq.heappop(open_heap)
+            if closed[state]:
+                continue  # stale heap entry
+            closed[state] = True
+            step_count += 1
+
+            cell, direction = divmod(state, 4)
+            if cell == end_cell:
+                self._log(f"\n*** GOAL REACHED in {step_count} exploration steps! ***")
+                stats.end_phase('search')
+                return self._finish_stats(stats, self._compact_path(state, g_cost, parent),
+                                          step_count, generated, reopened, peak_open)
+
+            row, col = divmod(cell, cols)
+            current_g = float(g_cost[state])
+            for offset, move_cost in actions:
+                new_direction = (direction + offset) % 4
+                d_row, d_col = deltas[new_direction]
+                new_row, new_col = row + d_row, col + d_col
+                if not (0 <= new_row < rows and 0 <= new_col < cols):
+                    continue
+                new_cell = new_row * cols + new_col
+                if not walkable[new_cell]:
+                    continue
+                new_state = new_cell * 4 + new_direction
+                if closed[new_state]:
+                    continue
+                new_g = current_g + move_cost
+                old_g = g_cost[new_state]
+                if new_g < old_g:
+                    new_h = float(h_field[new_state >> h_shift])
+                    if new_h == np.inf:
+                        continue  # goal unreachable from this state
+                    g_cost[new_state] = new_g
+                    parent[new_state] = state
+                    heapq.heappush(open_heap, (new_g + new_h, new_state))
+                    generated += 1
+                    if old_g != np.inf:
+                        reopened += 1
+                    if len(open_heap) > peak_open:
+                        peak_open = len(open_heap)
+
+        self._log("No path found!")
+        stats.end_phase('search')
+        return self._finish_stats(stats, None, step_count, generated, reopened, peak_open)
+
+    def _compact_path(self, goal_state, g_cost, parent):
+        """Build the MazeNode chain for a compact-search result and reconstruct it"""
+        states = []
+        state = goal_state
+        while state != -1:
+            states.append(state)
+            state = int(parent[state])
+        states.reverse()
+        return self._states_to_path(states)
+
+    def _states_to_path(self, states):
+        """Build the MazeNode chain for a start-to-goal list of flat states"""
+        node = None
+        g_cost = 0.0
+        for state in states:
+            cell, direction = divmod(state, 4)
+            if node is not None:
+                g_cost += 1.0 if direction == node.direction.value else 1.1
+            node = MazeNode(position=divmod(cell, self.cols),
+                            direction=Direction(direction),
+                            g_cost=g_cost,
+                            parent=node)
+        return self.reconstruct_path(node)
+
+    def _successors(self, state, walkable):
+        """Yield (next_state, move_cost) for forward, turn_right and turn_left"""
+        cell, direction = divmod(state, 4)
+        row, col = divmod(cell, self.cols)
+        for offset, move_cost in ((0, 1.0), (1, 1.1), (-1, 1.1)):
+            new_direction = (direction + offset) % 4
+            d_row, d_col = self.direction_vectors[Direction(new_direction)]
+            new_row, new_col = row + d_row, col + d_col
+            if 0 <= new_row < self.rows and 0 <= new_col < self.cols:
+                new_cell = new_row * self.cols + new_col
+                if walkable[new_cell]:
+                    yield new_cell * 4 + new_direction, move_cost
+
+    def _predecessors(self, state, walkable):
+        """Yield (previous_state, move_cost) for states that step into state"""
+        cell, direction = divmod(state, 4)
+        row, col = divmod(cell, self.cols)
+        d_row, d_col = self.direction_vectors[Direction(direction)]
+        prev_row, prev_col = row - d_row, col - d_col
+        if 0 <= prev_row < self.rows and 0 <= prev_col < self.cols:
+            prev_cell = prev_row * self.cols + prev_col
+            if walkable[prev_cell]:
+                # Entered facing direction after going forward, turning right or turning left
+                for offset, move_cost in ((0, 1.0), (-1, 1.1), (1, 1.1)):
+                    yield prev_cell * 4 + (direction + offset) % 4, move_cost
+
+    def _state_h(self, state):
+        """Forward heuristic for a flat state (exact if built, else Euclidean)"""
+        if self._exact_h is not None:
+            return float(self._exact_h.flat[state])
+        return float(self.heuristic_field().flat[state >> 2])
+
+    def solve_bidirectional(self, start_pos=None, start_direction=Direction.NORTH):
+        """Bidirectional A* over (row, col, direction) states.
+
+        The forward search runs from the start state towards end_pos; the
+        backward search runs from the four goal states (any facing) over
+        reversed forward/turn_right/turn_left moves towards start_pos. Both
+        use consistent heuristics, so the search stops once either frontier's
+        best f-cost reaches the cheapest meeting cost found so far.
+        """
+        if start_pos is None:
+            start_pos = self.start_pos
+        stats = self._start_stats('bidirectional')
+        if not self.is_reachable(start_pos, start_direction):
+            self._log("No path found!")
+            return self._finish_stats(stats, None)
+
+        cols = self.cols
+        walkable = (self.maze == 0).ravel()
+        start_state = (start_pos[0] * cols + start_pos[1]) * 4 + start_direction.value
+        end_cell = self.end_pos[0] * cols + self.end_pos[1]
+
+        def backward_h(state):
+            row, col = divmod(state >> 2, cols)
+            return math.hypot(row - start_pos[0], col - start_pos[1])
+
+        # Per direction: g-costs, parent links and open heap. The backward
+        # "parent" of a state is its successor on the way to the goal.
+        g = ({start_state: 0.0}, {})
+        links = ({start_state: -1}, {})
+        heaps = ([(self._state_h(start_state), start_state)], [])
+        closed = (set(), set())
+        for direction in range(4):
+            goal_state = end_cell * 4 + direction
+            g[1][goal_state] = 0.0
+            links[1][goal_state] = -1
+            heaps[1].append((backward_h(goal_state), goal_state))
+        heapq.heapify(heaps[1])
+        expand = (self._successors, self._predecessors)
+        estimate = (self._state_h, backward_h)
+
+        best_cost = math.inf
+        meeting_state = None
+        if start_state in g[1]:
+            best_cost, meeting_state = 0.0, start_state
+
+        step_count = 0
+        generated = peak_open = 5
+        reopened = 0
+        stats.end_phase('setup')
+        self._log("\nStarting bidirectional A* maze solving with movement constraints...")
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] >= best_cost or heaps[1][0][0] >= best_cost:
+                break
+            # Expand the smaller frontier
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            _, state = heapq.heappop(heaps[side])
+            if state in closed[side]:
+                continue
+            closed[side].add(state)
+            step_count += 1
+
+            current_g = g[side][state]
+            for new_state, move_cost in expand[side](state, walkable):
+                if new_state in closed[side]:
+                    continue
+                new_g = current_g + move_cost
+                old_g = g[side].get(new_state, math.inf)
+                if new_g < old_g:
+                    g[side][new_state] = new_g
+                    links[side][new_state] = state
+                    heapq.heappush(heaps[side], (new_g + estimate[side](new_state), new_state))
+                    generated += 1
+                    if old_g != math.inf:
+                        reopened += 1
+                    if len(heaps[0]) + len(heaps[1]) > peak_open:
+                        peak_open = len(heaps[0]) + len(heaps[1])
+                    other_g = g[1 - side].get(new_state)
+                    if other_g is not None and new_g + other_g < best_cost:
+                        best_cost, meeting_state = new_g + other_g, new_state
+
+        stats.end_phase('search')
+        if meeting_state is None:
+            self._log("No path found!")
+            return self._finish_stats(stats, None, step_count, generated, reopened, peak_open)
+
+        self._log(f"\n*** GOAL REACHED in {step_count} exploration steps! ***")
+        states = []
+        state = meeting_state
+        while state != -1:
+            states.append(state)
+            state = links[0][state]
+        states.reverse()
+        state = links[1][meeting_state]
+        while state != -1:
+            states.append(state)
+            state = links[1][state]
+        return self._finish_stats(stats, self._states_to_path(states),
+                                  step_count, generated, reopened, peak_open)
+
+    def solve_jump(self, start_pos=None, start_direction=Direction.NORTH):
+        """A* with forward-only corridors collapsed into single macro-edges.
+
+        After each action the agent keeps moving while forward is its only
+        legal action, accumulating 1.0 per step on top of the action's own
+        cost (1.0 forward, 1.1 turn). Only the state at the end of the run
+        (a junction, the goal cell or a dead end, which is pruned) enters the
+        open set, so long corridors cost one expansion instead of many.
+        """
+        if start_pos is None:
+            start_pos = self.start_pos
+        stats = self._start_stats('jump')
+        if not self.is_reachable(start_pos, start_direction):
+            self._log("No path found!")
+            return self._finish_stats(stats, None)
+
+        cols = self.cols
+        walkable = (self.maze == 0).ravel()
+        start_state = (start_pos[0] * cols + start_pos[1]) * 4 + start_direction.value
+        end_cell = self.end_pos[0] * cols + self.end_pos[1]
+
+        g_cost = {start_state: 0.0}
+        parent = {start_state: -1}
+        closed = set()
+        open_heap = [(self._state_h(start_state), start_state)]
+        step_count = 0
+        generated = peak_open = 1
+        reopened = 0
+        stats.end_phase('setup')
+        self._log("\nStarting corridor-jumping A* maze solving with movement constraints...")
+
+        while open_heap:
+            _, state = heapq.heappop(open_heap)
+            if state in closed:
+                continue
+            closed.add(state)
+            step_count += 1
 
-        print("No path found!")
-        return None
+            if state >> 2 == end_cell:
+                self._log(f"\n*** GOAL REACHED in {step_count} exploration steps! ***")
+                stats.end_phase('search')
+                return self._finish_stats(stats, self._states_to_path(self._expand_jumps(state, parent)),
+                                          step_count, generated, reopened, peak_open)
+
+            current_g = g_cost[state]
+            for new_state, move_cost in self._successors(state, walkable):
+                new_state, move_cost = self._follow_corridor(new_state, move_cost, walkable, end_cell)
+                if new_state is None or new_state in closed:
+                    continue
+                new_g = current_g + move_cost
+                old_g = g_cost.get(new_state, math.inf)
+                if new_g < old_g:
+                    g_cost[new_state] = new_g
+                    parent[new_state] = state
+                    heapq.heappush(open_heap, (new_g + self._state_h(new_state), new_state))
+                    generated += 1
+                    if old_g != math.inf:
+                        reopened += 1
+                    if len(open_heap) > peak_open:
+                        peak_open = len(open_heap)
+
+        self._log("No path found!")
+        stats.end_phase('search')
+        return self._finish_stats(stats, None, step_count, generated, reopened, peak_open)
+
+    def _follow_corridor(self, state, cost, walkable, end_cell):
+        """Advance while forward is the only legal action.
+
+        Returns the (state, cost) where the run stops, or (None, cost) if it
+        ends in a dead end other than the goal cell.
+        """
+        while state >> 2 != end_cell:
+            options = list(self._successors(state, walkable))
+            if not options:
+                return None, cost
+            if len(options) > 1 or options[0][0] & 3 != state & 3:
+                break
+            state = options[0][0]
+            cost += 1.0
+        return state, cost
+
+    def _expand_jumps(self, goal_state, parent):
+        """Turn a chain of macro-edge endpoints back into every visited state"""
+        endpoints = []
+        state = goal_state
+        while state != -1:
+            endpoints.append(state)
+            state = parent[state]
+        endpoints.reverse()
+
+        states = [endpoints[0]]
+        for end_state in endpoints[1:]:
+            # A macro-edge is one action into end_state's facing, then straight on
+            direction = end_state & 3
+            d_row, d_col = self.direction_vectors[Direction(direction)]
+            row, col = divmod(states[-1] >> 2, self.cols)
+            while True:
+                row, col = row + d_row, col + d_col
+                state = (row * self.cols + col) * 4 + direction
+                states.append(state)
+                if state == end_state:
+                    break
+        return states
+
+    def solve_many(self, queries, workers=None, mode='compact', chunk_size=None):
+        """Solve many (start_pos, start_direction, goal_pos) queries on this maze.
+
+        The grid is placed once in shared memory and attached zero-copy by a
+        pool of worker processes; each worker keeps one solver per goal so
+        goal fields are reused across its queries. Component labels, if this
+        solver has them (component_labels() or labels=), are shared the same
+        way. Results are yielded as (query_index, path) pairs in completion
+        order. workers defaults to os.cpu_count(); workers=1 solves
+        in-process. chunk_size defaults to about four chunks per worker, at
+        most 256 queries each.
+        """
+        queries = list(queries)
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if workers <= 1:
+            solvers = {}
+            labels = self._labels
+            for index, (start_pos, start_direction, goal_pos) in enumerate(queries):
+                solver = _solver_for_goal(solvers, self.maze, tuple(goal_pos), labels)
+                yield index, solver.solve(mode, start_pos, start_direction)
+            return
+
+        if chunk_size is None:
+            chunk_size = min(256, max(1, math.ceil(len(queries) / (workers * 4))))
+        # Group by goal so a chunk mostly hits one cached worker solver
+        order = sorted(range(len(queries)), key=lambda i: tuple(queries[i][2]))
+        chunks = [
+            [(i, tuple(queries[i][0]), queries[i][1], tuple(queries[i][2])) for i in order[pos:pos + chunk_size]]
+            for pos in range(0, len(order), chunk_size)
+        ]
+
+        grid = np.ascontiguousarray(self.maze, dtype=np.uint8)
+        shm = shared_memory.SharedMemory(create=True, size=max(grid.nbytes, 1))
+        labels_shm = None
+        try:
+            np.ndarray(grid.shape, dtype=grid.dtype, buffer=shm.buf)[:] = grid
+            labels_args = (None, None)
+            if self._labels is not None:
+                labels = np.ascontiguousarray(self._labels)
+                labels_shm = shared_memory.SharedMemory(create=True, size=max(labels.nbytes, 1))
+                np.ndarray(labels.shape, dtype=labels.dtype, buffer=labels_shm.buf)[:] = labels
+                labels_args = (labels_shm.name, labels.dtype.str)
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=_init_solve_worker,
+                                     initargs=(shm.name, grid.shape, grid.dtype.str, *labels_args)) as pool:
+                futures = [pool.submit(_solve_chunk, chunk, mode) for chunk in chunks]
+                for future in as_completed(futures):
+                    yield from future.result()
+        finally:
+            for block in (shm, labels_shm):
+                if block is not None:
+                    block.close()
+                    block.unlink()
 
     def reconstruct_path(self, goal_node):
         """Reconstruct path from goal to start"""
@@ -208,6 +934,9 @@ class MazeSolver:
 
     def visualize_solution(self, path):
         """Create visual representation of maze and solution path"""
+        # Imported here so headless users (render.py, solve_many) never load a GUI backend
+        import matplotlib.pyplot as plt
+
         fig, ax = plt.subplots(1, 1, figsize=(12, 10))
 
         # Create maze visualization
@@ -264,6 +993,8 @@ class MazeSolver:
         the solution path with orientation arrows.
         """
         try:
+            import turtle
+
             rows, cols = self.rows, self.cols
 
             # Setup screen
@@ -369,6 +1100,48 @@ class MazeSolver:
             # Fallback to matplotlib visualization
             self.visualize_solution(path)
 
+# Per-process state for solve_many workers
+_worker_maze = None
+_worker_shm = None
+_worker_labels = None
+_worker_labels_shm = None
+_worker_solvers = {}
+_MAX_WORKER_SOLVERS = 8
+
+
+def _solver_for_goal(solvers, maze, goal_pos, labels=None):
+    """Return a cached quiet solver for goal_pos, evicting the oldest if full.
+
+    labels, the grid's component_labels(), is shared by every goal's solver.
+    """
+    solver = solvers.get(goal_pos)
+    if solver is None:
+        if len(solvers) >= _MAX_WORKER_SOLVERS:
+            solvers.pop(next(iter(solvers)))
+        solver = MazeSolver(maze, start_pos=goal_pos, end_pos=goal_pos, copy=False, verbose=False, labels=labels)
+        solvers[goal_pos] = solver
+    return solver
+
+
+def _init_solve_worker(shm_name, shape, dtype, labels_name=None, labels_dtype=None):
+    """Attach the shared maze grid (and labels, if any) in a pool worker without copying"""
+    global _worker_maze, _worker_shm, _worker_labels, _worker_labels_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_maze = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_worker_shm.buf)
+    if labels_name is not None:
+        _worker_labels_shm = shared_memory.SharedMemory(name=labels_name)
+        _worker_labels = np.ndarray(shape, dtype=np.dtype(labels_dtype), buffer=_worker_labels_shm.buf)
+
+
+def _solve_chunk(chunk, mode):
+    """Solve a list of (index, start_pos, start_direction, goal_pos) in a worker"""
+    results = []
+    for index, start_pos, start_direction, goal_pos in chunk:
+        solver = _solver_for_goal(_worker_solvers, _worker_maze, goal_pos, _worker_labels)
+        results.append((index, solver.solve(mode, start_pos, start_direction)))
+    return results
+
+
 def main():
     """Main function to run the maze solver"""
 
@@ -393,7 +1166,7 @@ def main():
         print(f"Row {i:2d}: {' '.join(map(str, row))}")
 
     # Create and run solver
-    solver = MazeSolver(maze)
+    solver = MazeSolver(maze, verbose=True)
 
     # Solve the maze
     solution_path = solver.solve()
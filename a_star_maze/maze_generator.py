@@ -0,0 +1,313 @@
+import argparse
+from collections import deque
+
+import numpy as np
+
+from main import Direction
+from maze_io import PACKED_MAGIC, save_maze_npy, save_maze_packed
+
+
+# Grids use the solver's convention: uint8, 1 = wall, 0 = walkable.
+# Perfect mazes live on a lattice of cells at odd (row, col) coordinates with
+# the walls between them at even coordinates, so a grid is (2h + 1, 2w + 1).
+
+_LATTICE_STEPS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+
+def _lattice_shape(rows, cols):
+    height, width = (rows - 1) // 2, (cols - 1) // 2
+    if height < 1 or width < 1:
+        raise ValueError("Perfect mazes need at least 3x3 cells")
+    return height, width
+
+
+def _empty_lattice(height, width):
+    maze = np.ones((2 * height + 1, 2 * width + 1), dtype=np.uint8)
+    maze[1::2, 1::2] = 0
+    return maze
+
+
+def obstacle_field(rows, cols, density=0.3, seed=None):
+    """Independent random walls with the given target density"""
+    rng = np.random.default_rng(seed)
+    return (rng.random((rows, cols)) < density).astype(np.uint8)
+
+
+def binary_tree_maze(rows, cols, seed=None):
+    """Perfect maze where every cell opens north or east, fully vectorized.
+
+    Fastest of the perfect-maze generators; the price is a visible bias
+    (open top row and right column).
+    """
+    height, width = _lattice_shape(rows, cols)
+    rng = np.random.default_rng(seed)
+    maze = _empty_lattice(height, width)
+
+    go_north = rng.random((height, width)) < 0.5
+    go_north[0, :] = False  # top row can only go east
+    go_north[:, -1] = True  # right column can only go north
+    go_north[0, -1] = False  # top-right corner is the root
+
+    cell_rows, cell_cols = np.nonzero(go_north)
+    maze[2 * cell_rows, 2 * cell_cols + 1] = 0
+    cell_rows, cell_cols = np.nonzero(~go_north)
+    keep = cell_cols < width - 1
+    maze[2 * cell_rows[keep] + 1, 2 * cell_cols[keep] + 2] = 0
+    return maze
+
+
+def backtracker_maze(rows, cols, seed=None):
+    """Perfect maze from an iterative randomized depth-first search"""
+    height, width = _lattice_shape(rows, cols)
+    rng = np.random.default_rng(seed)
+    maze = _empty_lattice(height, width)
+    visited = np.zeros((height, width), dtype=bool)
+
+    stack = [(int(rng.integers(height)), int(rng.integers(width)))]
+    visited[stack[0]] = True
+    while stack:
+        row, col = stack[-1]
+        options = [(row + dr, col + dc) for dr, dc in _LATTICE_STEPS
+                   if 0 <= row + dr < height and 0 <= col + dc < width and not visited[row + dr, col + dc]]
+        if not options:
+            stack.pop()
+            continue
+        next_row, next_col = options[int(rng.integers(len(options)))]
+        maze[row + next_row + 1, col + next_col + 1] = 0  # wall between the two cells
+        visited[next_row, next_col] = True
+        stack.append((next_row, next_col))
+    return maze
+
+
+def prim_maze(rows, cols, seed=None):
+    """Perfect maze from randomized Prim's algorithm"""
+    height, width = _lattice_shape(rows, cols)
+    rng = np.random.default_rng(seed)
+    maze = _empty_lattice(height, width)
+    in_maze = np.zeros((height, width), dtype=bool)
+    in_frontier = np.zeros((height, width), dtype=bool)
+
+    def add_frontier(row, col):
+        for dr, dc in _LATTICE_STEPS:
+            nr, nc = row + dr, col + dc
+            if 0 <= nr < height and 0 <= nc < width and not in_maze[nr, nc] and not in_frontier[nr, nc]:
+                in_frontier[nr, nc] = True
+                frontier.append((nr, nc))
+
+    frontier = []
+    start = (int(rng.integers(height)), int(rng.integers(width)))
+    in_maze[start] = True
+    add_frontier(*start)
+    while frontier:
+        index = int(rng.integers(len(frontier)))
+        frontier[index], frontier[-1] = frontier[-1], frontier[index]
+        row, col = frontier.pop()
+        neighbours = [(row + dr, col + dc) for dr, dc in _LATTICE_STEPS
+                      if 0 <= row + dr < height and 0 <= col + dc < width and in_maze[row + dr, col + dc]]
+        link_row, link_col = neighbours[int(rng.integers(len(neighbours)))]
+        maze[row + link_row + 1, col + link_col + 1] = 0
+        in_maze[row, col] = True
+        add_frontier(row, col)
+    return maze
+
+
+def kruskal_maze(rows, cols, seed=None):
+    """Perfect maze from randomized Kruskal's algorithm (edge order shuffled in NumPy)"""
+    height, width = _lattice_shape(rows, cols)
+    rng = np.random.default_rng(seed)
+    maze = _empty_lattice(height, width)
+
+    cell_ids = np.arange(height * width).reshape(height, width)
+    edges = np.concatenate([
+        np.stack([cell_ids[:, :-1].ravel(), cell_ids[:, 1:].ravel()], axis=1),
+        np.stack([cell_ids[:-1, :].ravel(), cell_ids[1:, :].ravel()], axis=1),
+    ])
+    edges = edges[rng.permutation(len(edges))]
+
+    parent = list(range(height * width))
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    carved = np.zeros(len(edges), dtype=bool)
+    for index, (a, b) in enumerate(edges.tolist()):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_a] = root_b
+            carved[index] = True
+
+    a_rows, a_cols = np.divmod(edges[carved, 0], width)
+    b_rows, b_cols = np.divmod(edges[carved, 1], width)
+    maze[a_rows + b_rows + 1, a_cols + b_cols + 1] = 0
+    return maze
+
+
+def braid(maze, fraction=1.0, seed=None):
+    """Remove a fraction of the dead ends of a lattice maze by knocking out a wall.
+
+    Works on the output of the perfect-maze generators; each chosen dead end
+    opens one random wall that leads to another cell. Returns a new grid.
+    """
+    rng = np.random.default_rng(seed)
+    maze = maze.copy()
+    cells = maze[1:-1:2, 1:-1:2] == 0
+    height, width = cells.shape
+
+    # Open passages around each lattice cell, per direction (N, E, S, W)
+    walls_around = np.stack([
+        maze[0:-2:2, 1:-1:2], maze[1:-1:2, 2::2], maze[2::2, 1:-1:2], maze[1:-1:2, 0:-2:2]
+    ])
+    open_count = (walls_around == 0).sum(axis=0)
+    dead_end = cells & (open_count == 1) & (rng.random((height, width)) < fraction)
+
+    # A wall can be removed if the cell behind it is inside the lattice
+    row_idx, col_idx = np.indices((height, width))
+    inside = np.stack([row_idx > 0, col_idx < width - 1, row_idx < height - 1, col_idx > 0])
+    candidates = (walls_around == 1) & inside & dead_end
+    scores = np.where(candidates, rng.random(candidates.shape), -1.0)
+    choice = scores.argmax(axis=0)
+    chosen = dead_end & candidates.any(axis=0)
+
+    rows, cols, directions = row_idx[chosen], col_idx[chosen], choice[chosen]
+    steps = np.array(_LATTICE_STEPS)
+    maze[2 * rows + 1 + steps[directions, 0], 2 * cols + 1 + steps[directions, 1]] = 0
+    return maze
+
+
+GENERATORS = {
+    'obstacles': obstacle_field,
+    'binary_tree': binary_tree_maze,
+    'backtracker': backtracker_maze,
+    'prim': prim_maze,
+    'kruskal': kruskal_maze,
+}
+
+
+def _tile(kind, tile_index, row_start, row_stop, cols, density, seed):
+    """Grid rows [row_start, row_stop) of a streamable maze, seeded per tile"""
+    tile_seed = None if seed is None else [seed, tile_index]
+    if kind == 'obstacles':
+        return obstacle_field(row_stop - row_start, cols, density, tile_seed)
+    if kind == 'binary_tree':
+        # Cell row i owns grid rows 2i (its north wall) and 2i + 1, so tiles
+        # of whole cell rows are independent of each other
+        height, width = (row_stop - row_start) // 2, (cols - 1) // 2
+        rng = np.random.default_rng(tile_seed)
+        tile = np.ones((2 * height, 2 * width + 1), dtype=np.uint8)
+        tile[1::2, 1::2] = 0
+        go_north = rng.random((height, width)) < 0.5
+        go_north[:, -1] = True
+        if row_start == 0:
+            go_north[0, :] = False
+            go_north[0, -1] = False
+        cell_rows, cell_cols = np.nonzero(go_north)
+        tile[2 * cell_rows, 2 * cell_cols + 1] = 0
+        cell_rows, cell_cols = np.nonzero(~go_north)
+        keep = cell_cols < width - 1
+        tile[2 * cell_rows[keep] + 1, 2 * cell_cols[keep] + 2] = 0
+        return tile
+    raise ValueError(f"{kind!r} cannot be streamed; use 'obstacles' or 'binary_tree'")
+
+
+def stream_maze(path, rows, cols, kind='obstacles', density=0.3, seed=None, rows_per_tile=4096):
+    """Generate a maze tile by tile straight into a .npy file.
+
+    Only one tile of rows is in memory at a time, so the grid can be larger
+    than RAM; open the result with maze_io.load_maze / MazeSolver.from_file.
+    Binary-tree grids are rounded down to odd dimensions.
+    """
+    if kind == 'binary_tree':
+        rows, cols = 2 * ((rows - 1) // 2) + 1, 2 * ((cols - 1) // 2) + 1
+        rows_per_tile += rows_per_tile % 2
+    grid = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=(rows, cols))
+    for tile_index, row_start in enumerate(range(0, rows, rows_per_tile)):
+        row_stop = min(row_start + rows_per_tile, rows)
+        if kind == 'binary_tree' and row_stop == rows:
+            grid[row_start:row_stop - 1] = _tile(kind, tile_index, row_start, row_stop - 1, cols, density, seed)
+            grid[rows - 1] = 1  # bottom boundary wall
+        else:
+            grid[row_start:row_stop] = _tile(kind, tile_index, row_start, row_stop, cols, density, seed)
+    grid.flush()
+    return grid
+
+
+def solvable_pairs(maze, count, seed=None, max_states=100000):
+    """Random (start_pos, start_direction, goal_pos) queries that have a path.
+
+    A breadth-first search over (position, direction) states from a random
+    start, using the forward/turn_right/turn_left moves, collects up to
+    max_states reachable states; the goal is drawn from their cells. Starts
+    that cannot move are redrawn.
+    """
+    rng = np.random.default_rng(seed)
+    rows, cols = maze.shape
+    steps = [(-1, 0), (0, 1), (1, 0), (0, -1)]  # indexed by Direction.value
+    pairs = []
+    attempts = 0
+    while len(pairs) < count:
+        attempts += 1
+        if attempts > 100 * count:
+            raise ValueError("Could not find enough solvable start/goal pairs")
+        start = (int(rng.integers(rows)), int(rng.integers(cols)))
+        if maze[start] != 0:
+            continue
+        direction = int(rng.integers(4))
+
+        seen = {(start, direction)}
+        queue = deque(seen)
+        while queue and len(seen) < max_states:
+            (row, col), facing = queue.popleft()
+            for offset in (0, 1, -1):
+                new_facing = (facing + offset) % 4
+                new_pos = (row + steps[new_facing][0], col + steps[new_facing][1])
+                if (0 <= new_pos[0] < rows and 0 <= new_pos[1] < cols and maze[new_pos] == 0
+                        and (new_pos, new_facing) not in seen):
+                    seen.add((new_pos, new_facing))
+                    queue.append((new_pos, new_facing))
+
+        goals = sorted({pos for pos, _ in seen if pos != start})
+        if goals:
+            pairs.append((start, Direction(direction), goals[int(rng.integers(len(goals)))]))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate mazes for MazeSolver load testing")
+    parser.add_argument("output", help=".npy path, or a packed file when --packed is given")
+    parser.add_argument("--kind", default="backtracker", choices=sorted(GENERATORS))
+    parser.add_argument("--rows", default=1025, type=int)
+    parser.add_argument("--cols", default=1025, type=int)
+    parser.add_argument("--density", default=0.3, type=float, help="wall density for 'obstacles'")
+    parser.add_argument("--braid", default=0.0, type=float, help="fraction of dead ends to remove")
+    parser.add_argument("--seed", default=None, type=int)
+    parser.add_argument("--stream", action="store_true", help="write a .npy tile by tile (obstacles/binary_tree)")
+    parser.add_argument("--packed", action="store_true", help=f"write the {PACKED_MAGIC.decode()} bit-packed format")
+    args = parser.parse_args()
+    if args.stream:
+        if args.kind not in ('obstacles', 'binary_tree'):
+            parser.error(f"--stream supports --kind obstacles or binary_tree, not {args.kind}")
+        if args.packed or args.braid:
+            parser.error("--stream writes a plain .npy and cannot be combined with --packed or --braid")
+
+    if args.stream:
+        stream_maze(args.output, args.rows, args.cols, args.kind, args.density, args.seed)
+        return
+
+    if args.kind == 'obstacles':
+        maze = obstacle_field(args.rows, args.cols, args.density, args.seed)
+    else:
+        maze = GENERATORS[args.kind](args.rows, args.cols, args.seed)
+    if args.braid:
+        maze = braid(maze, args.braid, args.seed)
+    if args.packed:
+        save_maze_packed(maze, args.output)
+    else:
+        save_maze_npy(maze, args.output)
+    print(f"Wrote {maze.shape[0]}x{maze.shape[1]} {args.kind} maze to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import numpy as np
+
+
+PACKED_MAGIC = b'MAZEBITS'
+# magic + rows + cols, both little-endian uint64
+PACKED_HEADER_SIZE = len(PACKED_MAGIC) + 16
+NPY_MAGIC = b'\x93NUMPY'
+
+
+class PackedMaze:
+    """Read-through view of a bit-packed maze file (1 bit per cell, 1 = wall).
+
+    Cells are read straight from the memory-mapped bytes, so opening the file
+    is instant and only the pages that the search touches are loaded.
+    Converting the whole grid (np.asarray, == comparisons) unpacks it.
+    """
+
+    def __init__(self, path, writable=False):
+        with open(path, 'rb') as f:
+            header = f.read(PACKED_HEADER_SIZE)
+        if header[:len(PACKED_MAGIC)] != PACKED_MAGIC:
+            raise ValueError(f"{path} is not a packed maze file")
+        rows, cols = np.frombuffer(header, dtype='<u8', offset=len(PACKED_MAGIC), count=2)
+        self.shape = (int(rows), int(cols))
+        self.path = path
+        self._bits = np.memmap(path, dtype=np.uint8, mode='r+' if writable else 'r',
+                               offset=PACKED_HEADER_SIZE, shape=(self.shape[0], (self.shape[1] + 7) // 8))
+
+    @property
+    def nbytes(self):
+        return self._bits.nbytes
+
+    def __getitem__(self, index):
+        row, col = index
+        if isinstance(row, slice) or isinstance(col, slice):
+            # Unpack only the requested rows
+            rows = row if isinstance(row, slice) else slice(row, row + 1)
+            block = np.unpackbits(self._bits[rows], axis=1, count=self.shape[1])[:, col]
+            return block if isinstance(row, slice) else block[0]
+        return (int(self._bits[row, col >> 3]) >> (7 - (col & 7))) & 1
+
+    def __setitem__(self, index, value):
+        row, col = index
+        mask = 1 << (7 - (col & 7))
+        byte = int(self._bits[row, col >> 3])
+        self._bits[row, col >> 3] = byte | mask if value else byte & ~mask
+
+    def __array__(self, dtype=None, copy=None):
+        grid = np.unpackbits(self._bits, axis=1, count=self.shape[1])
+        return grid if dtype is None else grid.astype(dtype)
+
+    def __eq__(self, other):
+        return np.asarray(self) == other
+
+    def flush(self):
+        self._bits.flush()
+
+
+def save_maze_npy(maze, path):
+    """Write a maze as a uint8 .npy file that load_maze can memory-map"""
+    np.save(path, np.asarray(maze, dtype=np.uint8))
+
+
+def save_maze_packed(maze, path, rows_per_chunk=4096):
+    """Write a maze in the bit-packed format, a block of rows at a time"""
+    rows, cols = np.shape(maze)
+    with open(path, 'wb') as f:
+        f.write(PACKED_MAGIC)
+        f.write(np.array([rows, cols], dtype='<u8').tobytes())
+        for start in range(0, rows, rows_per_chunk):
+            block = np.asarray(maze[start:start + rows_per_chunk]) != 0
+            f.write(np.packbits(block, axis=1).tobytes())
+
+
+def load_maze(path, writable=False):
+    """Memory-map a maze file without reading it into RAM.
+
+    .npy files come back as np.memmap (uint8 recommended, see save_maze_npy);
+    packed files come back as PackedMaze. writable=True maps the file
+    read-write so update_cells() changes are written through.
+    """
+    with open(path, 'rb') as f:
+        magic = f.read(len(PACKED_MAGIC))
+    if magic.startswith(NPY_MAGIC):
+        return np.load(path, mmap_mode='r+' if writable else 'r')
+    if magic == PACKED_MAGIC:
+        return PackedMaze(path, writable=writable)
+    raise ValueError(f"Unrecognised maze file format: {path}")
@@ -0,0 +1,187 @@
+import heapq
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from main import Direction, MazeSolver
+
+
+class MultiAgentPlanner:
+    """Cooperative A* for many agents sharing one grid.
+
+    Agents are planned one after another in priority order. Each plan is a
+    space-time search over (position, direction, time) using the solver's
+    forward/turn_right/turn_left moves, one move per time step, plus an
+    optional wait-in-place action (cost wait_cost). Planned paths are written
+    into a reservation table of occupied (cell, time) pairs and traversed
+    edges, so later agents avoid vertex and swap conflicts; an agent that has
+    arrived keeps its goal cell for good, and one that found no path keeps
+    its start cell. Agents planned before a failed one are not replanned
+    around it.
+
+    The heuristic is the exact cost-to-go field of each goal
+    (MazeSolver.build_exact_heuristic). Fields are cached per goal and shared
+    by every agent heading there, so per-agent cost stays roughly flat as the
+    fleet grows. An agent whose search exceeds expansion_budget times its
+    unconstrained path length gives up, which bounds the cost of agents that
+    cannot get through.
+    """
+
+    def __init__(self, maze, allow_wait=True, wait_cost=1.0, max_fields=64, expansion_budget=1000):
+        self.maze = np.asanyarray(maze)
+        self.rows, self.cols = self.maze.shape
+        self.allow_wait = allow_wait
+        self.wait_cost = wait_cost
+        self.max_fields = max_fields
+        self.expansion_budget = expansion_budget
+        self._fields = OrderedDict()  # goal_pos -> exact (rows * cols * 4) cost-to-go
+        direction_vectors = MazeSolver(self.maze, copy=False).direction_vectors
+        self.deltas = [direction_vectors[Direction(d)] for d in range(4)]
+        self.walkable = (self.maze == 0).ravel()
+        self.expanded = []
+        self.clear_reservations()
+
+    def clear_reservations(self):
+        self._vertex = {}  # (cell, time) -> agent index
+        self._edges = set()  # (from_cell, to_cell, time) moves taken at time -> time + 1
+        self._parked = {}  # goal cell -> time its agent arrives and stays
+        self._last_use = {}  # cell -> latest reserved time
+
+    def heuristic_field(self, goal_pos):
+        """Shared exact cost-to-go for goal_pos, built once and LRU-cached"""
+        goal_pos = tuple(goal_pos)
+        field = self._fields.get(goal_pos)
+        if field is None:
+            solver = MazeSolver(self.maze, end_pos=goal_pos, copy=False)
+            field = solver.build_exact_heuristic().reshape(-1)
+            self._fields[goal_pos] = field
+            if len(self._fields) > self.max_fields:
+                self._fields.popitem(last=False)
+        else:
+            self._fields.move_to_end(goal_pos)
+        return field
+
+    def plan(self, agents, horizon=None):
+        """Plan collision-free paths for [(start_pos, start_direction, goal_pos), ...].
+
+        Returns one path per agent in input order: a list of
+        (position, Direction) per time step (repeated while waiting), or None
+        when no conflict-free path exists within the horizon. horizon defaults
+        to twice each agent's unconstrained path cost plus one step per agent.
+        Each call starts from an empty reservation table.
+        """
+        self.clear_reservations()
+        self._agent_count = len(agents)
+        # Every agent occupies its start cell at time 0
+        for index, (start_pos, _, _) in enumerate(agents):
+            cell = start_pos[0] * self.cols + start_pos[1]
+            self._vertex[(cell, 0)] = index
+            self._last_use[cell] = max(self._last_use.get(cell, 0), 0)
+
+        self.expanded = []
+        paths = []
+        for index, (start_pos, start_direction, goal_pos) in enumerate(agents):
+            path = self._plan_agent(index, tuple(start_pos), start_direction, tuple(goal_pos), horizon)
+            if path is None:
+                # It stays where it is, so later agents must route around it
+                self._parked[start_pos[0] * self.cols + start_pos[1]] = 0
+            paths.append(path)
+        return paths
+
+    def _blocked(self, index, from_cell, to_cell, time):
+        """Whether moving from_cell -> to_cell between time and time + 1 conflicts"""
+        owner = self._vertex.get((to_cell, time + 1))
+        if owner is not None and owner != index:
+            return True
+        if (to_cell, from_cell, time) in self._edges:
+            return True
+        parked_at = self._parked.get(to_cell)
+        return parked_at is not None and parked_at <= time + 1
+
+    def _plan_agent(self, index, start_pos, start_direction, goal_pos, horizon):
+        cols = self.cols
+        h_field = self.heuristic_field(goal_pos)
+        start_state = (start_pos[0] * cols + start_pos[1]) * 4 + start_direction.value
+        goal_cell = goal_pos[0] * cols + goal_pos[1]
+        start_h = float(h_field[start_state])
+        if start_h == math.inf:
+            self.expanded.append(0)
+            return None
+        if horizon is None:
+            horizon = int(start_h * 2) + self._agent_count + 10
+
+        max_expanded = self.expansion_budget * (int(start_h) + 1)
+
+        moves = [(0, 1.0), (1, 1.1), (-1, 1.1)]
+        g = {(start_state, 0): 0.0}
+        parent = {(start_state, 0): None}
+        heap = [(start_h, 0, start_state)]
+        closed = set()
+        expanded = 0
+        while heap:
+            _, time, state = heapq.heappop(heap)
+            key = (state, time)
+            if key in closed:
+                continue
+            closed.add(key)
+            expanded += 1
+            if expanded > max_expanded:
+                break
+
+            cell, direction = divmod(state, 4)
+            if cell == goal_cell and self._last_use.get(cell, -1) < time:
+                self.expanded.append(expanded)
+                return self._reserve(index, key, parent)
+            if time >= horizon:
+                continue
+
+            row, col = divmod(cell, cols)
+            successors = []
+            for offset, move_cost in moves:
+                new_direction = (direction + offset) % 4
+                d_row, d_col = self.deltas[new_direction]
+                new_row, new_col = row + d_row, col + d_col
+                if 0 <= new_row < self.rows and 0 <= new_col < cols:
+                    new_cell = new_row * cols + new_col
+                    if self.walkable[new_cell]:
+                        successors.append((new_cell * 4 + new_direction, move_cost))
+            if self.allow_wait:
+                successors.append((state, self.wait_cost))
+
+            for new_state, move_cost in successors:
+                if self._blocked(index, cell, new_state >> 2, time):
+                    continue
+                new_key = (new_state, time + 1)
+                new_g = g[key] + move_cost
+                if new_key not in closed and new_g < g.get(new_key, math.inf):
+                    new_h = float(h_field[new_state])
+                    if new_h == math.inf:
+                        continue
+                    g[new_key] = new_g
+                    parent[new_key] = key
+                    heapq.heappush(heap, (new_g + new_h, time + 1, new_state))
+
+        self.expanded.append(expanded)
+        return None
+
+    def _reserve(self, index, goal_key, parent):
+        """Write an agent's path into the reservation table and return it"""
+        keys = []
+        key = goal_key
+        while key is not None:
+            keys.append(key)
+            key = parent[key]
+        keys.reverse()
+
+        previous_cell = None
+        for state, time in keys:
+            cell = state >> 2
+            self._vertex[(cell, time)] = index
+            self._last_use[cell] = max(self._last_use.get(cell, 0), time)
+            if previous_cell is not None and previous_cell != cell:
+                self._edges.add((previous_cell, cell, time - 1))
+            previous_cell = cell
+        self._parked[goal_key[0] >> 2] = goal_key[1]
+
+        return [(divmod(state >> 2, self.cols), Direction(state & 3)) for state, _ in keys]
@@ -0,0 +1,111 @@
+import sys
+from collections import OrderedDict
+
+from main import Direction
+
+
+# Rough per-step footprint of a cached path: the (position, direction) tuple,
+# its position tuple, the list slot and the subpath index entry.
+_STEP_BYTES = 200
+
+
+class PathCache:
+    """LRU cache of solve() results in front of a MazeSolver.
+
+    Entries are keyed on (start_pos, start_direction, end_pos) and tagged with
+    the solver's maze_version, so any update_cells() change empties the cache
+    on the next lookup. Bounded by both entry count and estimated bytes.
+
+    Because every suffix of an optimal path is itself optimal, a query whose
+    start state lies on a cached path is answered from that path's suffix.
+    """
+
+    def __init__(self, solver, max_entries=1024, max_bytes=64 * 1024 * 1024, mode='compact'):
+        self.solver = solver
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.mode = mode
+
+        self._entries = OrderedDict()  # key -> (path, size_bytes)
+        self._subpaths = {}  # (position, direction, end_pos) -> (key, index into path)
+        self._bytes = 0
+        self._version = solver.maze_version
+
+        self.hits = 0
+        self.subpath_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def solve(self, start_pos=None, start_direction=Direction.NORTH):
+        """Return the solver's path for this start state, from cache when possible"""
+        if start_pos is None:
+            start_pos = self.solver.start_pos
+        if self._version != self.solver.maze_version:
+            self.clear()
+            self.invalidations += 1
+            self._version = self.solver.maze_version
+
+        key = (tuple(start_pos), start_direction, self.solver.end_pos)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            path = self._entries[key][0]
+            return list(path) if path is not None else None
+
+        through = self._subpaths.get(key)
+        if through is not None:
+            owner, index = through
+            self._entries.move_to_end(owner)
+            self.subpath_hits += 1
+            return self._entries[owner][0][index:]
+
+        self.misses += 1
+        path = self.solver.solve(self.mode, key[0], start_direction)
+        self._store(key, path)
+        return list(path) if path is not None else None
+
+    def _store(self, key, path):
+        size = sys.getsizeof(path) + (len(path) * _STEP_BYTES if path else 0)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (path, size)
+        self._bytes += size
+        if path:
+            for index, (position, direction) in enumerate(path):
+                self._subpaths.setdefault((position, direction, key[2]), (key, index))
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Drop the least recently used entry and its subpath index"""
+        key, (path, size) = self._entries.popitem(last=False)
+        self._bytes -= size
+        self.evictions += 1
+        if path:
+            for position, direction in path:
+                state = (position, direction, key[2])
+                if self._subpaths.get(state, (None,))[0] == key:
+                    del self._subpaths[state]
+
+    def clear(self):
+        """Forget every cached path (counters are kept)"""
+        self._entries.clear()
+        self._subpaths.clear()
+        self._bytes = 0
+
+    def stats(self):
+        """Counters and current size of the cache"""
+        return {
+            'hits': self.hits,
+            'subpath_hits': self.subpath_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+        }
@@ -0,0 +1,145 @@
+import os
+import struct
+import zlib
+
+import numpy as np
+
+
+WALL = (0, 0, 0)
+FLOOR = (255, 255, 255)
+PATH = (220, 40, 40)
+START = (40, 170, 60)
+GOAL = (40, 80, 220)
+ARROW = (255, 165, 0)
+
+
+def write_png(filename, image, compress_level=1):
+    """Write an (H, W, 3) uint8 RGB array as a PNG using only zlib"""
+    height, width, _ = image.shape
+    raw = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 0] = 0  # filter type "None" for every scanline
+    raw[:, 1:] = image.reshape(height, width * 3)
+
+    def chunk(tag, payload):
+        return (struct.pack('>I', len(payload)) + tag + payload
+                + struct.pack('>I', zlib.crc32(tag + payload) & 0xffffffff))
+
+    with open(filename, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(raw.tobytes(), compress_level)))
+        f.write(chunk(b'IEND', b''))
+
+
+class SolutionRenderer:
+    """Rasterize a MazeSolver's grid and solution paths into RGB arrays.
+
+    The maze background is drawn once per renderer, so each path only costs
+    a copy plus a few vectorized writes. Nothing here imports matplotlib or
+    turtle, so it is safe for batch runs without a display.
+    """
+
+    def __init__(self, solver, cell_size=8):
+        self.solver = solver
+        self.cell_size = cell_size
+        self.rows, self.cols = solver.rows, solver.cols
+
+        walls = np.asarray(solver.maze) != 0
+        cells = np.where(walls[..., None], np.array(WALL, np.uint8), np.array(FLOOR, np.uint8))
+        self.background = np.repeat(np.repeat(cells, cell_size, axis=0), cell_size, axis=1)
+        self.arrow_masks = self._arrow_masks() if cell_size >= 5 else None
+
+    def _arrow_masks(self):
+        """Triangle glyphs per Direction.value, oriented by direction_vectors"""
+        size = self.cell_size
+        margin = max(1, size // 5)
+        ys, xs = np.mgrid[0:size, 0:size]
+        # Triangle pointing up: apex at the top margin, base at the bottom margin
+        depth = (ys - margin) / max(1, size - 2 * margin - 1)
+        up = (ys >= margin) & (ys < size - margin) & (np.abs(xs - (size - 1) / 2) <= depth * (size / 2 - margin))
+
+        masks = {}
+        for direction, (d_row, d_col) in self.solver.direction_vectors.items():
+            # Quarter turns from "up" (-1, 0): clockwise for positive d_col
+            quarter_turns = {(-1, 0): 0, (0, 1): -1, (1, 0): 2, (0, -1): 1}[(d_row, d_col)]
+            masks[direction.value] = np.rot90(up, k=quarter_turns)
+        return masks
+
+    def _cells(self, image):
+        """(rows, cols, cell, cell, 3) view of an image, one block per maze cell"""
+        size = self.cell_size
+        return image.reshape(self.rows, size, self.cols, size, 3).swapaxes(1, 2)
+
+    def render(self, path, arrow_every=None, start_pos=None, end_pos=None):
+        """Return the RGB image of one solution path.
+
+        Arrows are drawn every arrow_every steps (default: ~8 along the
+        path, as in visualize_solution). Start/end default to the path ends.
+        """
+        image = self.background.copy()
+        cells = self._cells(image)
+        if path:
+            rows = np.fromiter((pos[0] for pos, _ in path), dtype=np.intp, count=len(path))
+            cols = np.fromiter((pos[1] for pos, _ in path), dtype=np.intp, count=len(path))
+            cells[rows, cols] = PATH
+
+            if self.arrow_masks is not None:
+                step = arrow_every or max(1, len(path) // 8)
+                directions = np.fromiter((d.value for _, d in path[::step]), dtype=np.intp)
+                for value, mask in self.arrow_masks.items():
+                    picked = directions == value
+                    if picked.any():
+                        blocks = cells[rows[::step][picked], cols[::step][picked]]
+                        blocks[:, mask] = ARROW
+                        cells[rows[::step][picked], cols[::step][picked]] = blocks
+
+            start_pos = start_pos or path[0][0]
+            end_pos = end_pos or path[-1][0]
+        else:
+            start_pos = start_pos or self.solver.start_pos
+            end_pos = end_pos or self.solver.end_pos
+        cells[start_pos] = START
+        cells[end_pos] = GOAL
+        return image
+
+    def frames(self, path):
+        """Yield one image per step with the agent's path drawn so far"""
+        image = self.background.copy()
+        cells = self._cells(image)
+        end_pos = path[-1][0] if path else self.solver.end_pos
+        cells[end_pos] = GOAL
+        for index, (position, direction) in enumerate(path or ()):
+            if index:
+                cells[path[index - 1][0]] = PATH
+            cells[position] = START
+            if self.arrow_masks is not None:
+                cells[position][self.arrow_masks[direction.value]] = ARROW
+            yield image.copy()
+
+    def render_batch(self, paths, **kwargs):
+        """Yield an image for each path, reusing the cached background"""
+        for path in paths:
+            yield self.render(path, **kwargs)
+
+    def save(self, path, filename='maze_solution.png', **kwargs):
+        write_png(filename, self.render(path, **kwargs))
+
+    def save_frames(self, path, out_dir, prefix='frame'):
+        """Write the animation as numbered PNGs; returns the file names"""
+        os.makedirs(out_dir, exist_ok=True)
+        names = []
+        for index, image in enumerate(self.frames(path)):
+            name = os.path.join(out_dir, f"{prefix}_{index:05d}.png")
+            write_png(name, image)
+            names.append(name)
+        return names
+
+    def save_batch(self, paths, out_dir, prefix='solution', **kwargs):
+        """Write one PNG per path; returns the file names"""
+        os.makedirs(out_dir, exist_ok=True)
+        names = []
+        for index, image in enumerate(self.render_batch(paths, **kwargs)):
+            name = os.path.join(out_dir, f"{prefix}_{index:05d}.png")
+            write_png(name, image)
+            names.append(name)
+        return names
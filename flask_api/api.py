@@ -1,47 +1,344 @@
-from flask import Flask
+import hashlib
+import json
+from functools import wraps
+
+from flask import Flask, Response, jsonify, request, stream_with_context, url_for
 from flask_sqlalchemy import SQLAlchemy
 from flask_restful import Resource, Api, reqparse, fields, marshal_with, abort
+from flask_restful.utils import unpack
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
+
+from config import configure_engine, load_config
+from metrics import Metrics
+from response_cache import CachedResponse, MemoryBackend, ResponseCache
+from serialization import dump_users, stream_users
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///example.db'
+load_config(app)
 db = SQLAlchemy(app)
+metrics = Metrics()
+with app.app_context():
+    configure_engine(db.engine, app.config)
+    metrics.init_app(app, db.engine)
 api = Api(app)
+response_cache = ResponseCache(
+    MemoryBackend(app.config['RESPONSE_CACHE_MAX_ENTRIES'], app.config['RESPONSE_CACHE_MAX_BYTES']),
+    ttl=app.config['RESPONSE_CACHE_TTL'],
+)
+metrics.add_stats('cache', response_cache.stats)
 
 class UserModel(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(80), unique=True, nullable=False)
+    name = db.Column(db.String(80), unique=True, index=True, nullable=False)
+    email = db.Column(db.String(80), unique=True, index=True, nullable=False)
 
     def __repr__(self):
         return f"User(name={self.name}, email={self.email})"
-    
+
+
+def _mark_changed(session, *tags):
+    """Queue cache tags to invalidate once the session's transaction commits"""
+    session.info.setdefault('cache_tags', set()).update(tags)
+
+
+def _user_changed(mapper, connection, target):
+    _mark_changed(object_session(target), 'users', f'user:{target.id}')
+
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(UserModel, _event_name, _user_changed)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    tags = session.info.pop('cache_tags', None)
+    if tags:
+        response_cache.invalidate(*tags)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop('cache_tags', None)
+
+
+def cached(*tags):
+    """Serve a resource's GET from response_cache, with ETag/If-None-Match.
+
+    tags are formatted with the view arguments (e.g. 'user:{user_id}') and
+    let writes invalidate exactly the responses they affect.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            key = request.url
+            entry = response_cache.get(key)
+            if entry is None:
+                generation = response_cache.generation
+                response = method(*args, **kwargs)
+                if not isinstance(response, Response):
+                    data, code, headers = unpack(response)
+                    response = api.make_response(data, code, headers=headers)
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+                entry = CachedResponse(body, 200, list(response.headers), etag)
+                response_cache.set(key, entry, [tag.format(**kwargs) for tag in tags], generation)
+            if request.if_none_match.contains(entry.etag):
+                response_cache.record_not_modified(len(entry.body))
+                response = Response(status=304)
+            else:
+                response = Response(entry.body, status=entry.status, headers=entry.headers)
+            response.set_etag(entry.etag)
+            return response
+        return wrapper
+    return decorator
+
+
 user_args = reqparse.RequestParser()
 user_args.add_argument('name', type=str, required=True, help="Name cannot be blank")
 user_args.add_argument('email', type=str, required=True, help="Email cannot be blank")
 
+page_args = reqparse.RequestParser()
+page_args.add_argument('limit', type=int, location='args', help="limit must be an integer")
+page_args.add_argument('after', type=int, location='args', default=0, help="after must be a user id")
+
 userFields = {
     'id':fields.Integer,
     'name':fields.String,
     'email':fields.String,
 }
 
+def _user_rows(after_id, limit):
+    """(id, name, email) tuples after a keyset cursor, without loading ORM objects"""
+    return db.session.execute(
+        db.select(UserModel.id, UserModel.name, UserModel.email)
+        .where(UserModel.id > after_id)
+        .order_by(UserModel.id)
+        .limit(limit)
+    ).all()
+
 class Users(Resource):
-    @marshal_with(userFields)
+    @cached('users')
     def get(self):
-        users = UserModel.query.all()
-        return users
+        """One page of users ordered by id, starting after the `after` cursor.
+
+        The next page's URL is sent in a Link header (rel="next") and its
+        cursor in X-Next-Cursor; both are omitted on the last page.
+        """
+        args = page_args.parse_args()
+        limit = args["limit"] if args["limit"] is not None else app.config['USERS_PAGE_SIZE']
+        if not 1 <= limit <= app.config['USERS_MAX_PAGE_SIZE']:
+            abort(400, message=f"limit must be between 1 and {app.config['USERS_MAX_PAGE_SIZE']}")
+
+        # Keyset pagination: seek on the primary key instead of OFFSET
+        rows = _user_rows(args["after"], limit + 1)
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            cursor = rows[-1][0]
+            next_url = url_for('users', limit=limit, after=cursor, _external=True)
+            headers = {'Link': f'<{next_url}>; rel="next"', 'X-Next-Cursor': str(cursor)}
+        return Response(dump_users(rows), mimetype='application/json', headers=headers)
     
     @marshal_with(userFields)
     def post(self):
         args = user_args.parse_args()
         user = UserModel(name=args["name"], email=args["email"])
         db.session.add(user)
-        db.session.commit()
-        users = UserModel.query.all()
-        return users, 201
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            abort(409, message="A user with this name or email already exists")
+        return user, 201
     
 api.add_resource(Users, '/api/users/')
 
+
+class User(Resource):
+    @cached('user:{user_id}')
+    @marshal_with(userFields)
+    def get(self, user_id):
+        user = db.session.get(UserModel, user_id)
+        if user is None:
+            abort(404, message=f"User {user_id} not found")
+        return user
+
+api.add_resource(User, '/api/users/<int:user_id>')
+
+
+def _user_batches(batch_size):
+    """Yield the users table in keyset batches of (id, name, email) rows"""
+    last_id = 0
+    while True:
+        rows = _user_rows(last_id, batch_size)
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+@app.route('/api/users/export')
+def export_users():
+    """Stream every user as one JSON array without loading the table into memory"""
+    batch_size = max(1, request.args.get('batch_size', app.config['USERS_EXPORT_BATCH_SIZE'], type=int))
+    return Response(stream_with_context(stream_users(_user_batches(batch_size))), mimetype='application/json')
+
+
+def _validate_user(row):
+    """Apply the user_args rules to one bulk row; returns (values, error)"""
+    if not isinstance(row, dict):
+        return None, "Expected a JSON object"
+    values = {}
+    for arg in user_args.args:
+        value = row.get(arg.name)
+        if value is None:
+            if arg.required:
+                return None, arg.help
+            continue
+        try:
+            values[arg.name] = arg.type(value)
+        except (TypeError, ValueError):
+            return None, arg.help
+    return values, None
+
+
+def _bulk_rows(stream, is_ndjson):
+    """Yield (index, row or None, parse error) from a JSON array or NDJSON body"""
+    if is_ndjson:
+        index = 0
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield index, json.loads(line), None
+            except ValueError as e:
+                yield index, None, f"Invalid JSON: {e}"
+            index += 1
+        return
+    try:
+        rows = json.load(stream)
+    except ValueError as e:
+        yield 0, None, f"Invalid JSON: {e}"
+        return
+    if not isinstance(rows, list):
+        yield 0, None, "Expected a JSON array of users"
+        return
+    for index, row in enumerate(rows):
+        yield index, row, None
+
+
+def _insert_batch(batch):
+    """Insert [(index, values), ...] in one transaction; returns (inserted, errors).
+
+    Rows whose name or email already exists, in the table or earlier in the
+    batch, are reported instead of inserted so the rest of the batch commits.
+    """
+    names = {values['name'] for _, values in batch}
+    emails = {values['email'] for _, values in batch}
+    taken = db.session.execute(
+        db.select(UserModel.name, UserModel.email)
+        .where(UserModel.name.in_(names) | UserModel.email.in_(emails))
+    ).all()
+    taken_names = {name for name, _ in taken}
+    taken_emails = {email for _, email in taken}
+
+    rows, errors = [], []
+    for index, values in batch:
+        if values['name'] in taken_names:
+            errors.append({'row': index, 'error': f"name '{values['name']}' already exists"})
+        elif values['email'] in taken_emails:
+            errors.append({'row': index, 'error': f"email '{values['email']}' already exists"})
+        else:
+            taken_names.add(values['name'])
+            taken_emails.add(values['email'])
+            rows.append((index, values))
+
+    if not rows:
+        return 0, errors
+    # Core inserts skip the ORM events, so flag the cached listings directly
+    _mark_changed(db.session, 'users')
+    try:
+        db.session.execute(db.insert(UserModel), [values for _, values in rows])
+        db.session.commit()
+        return len(rows), errors
+    except IntegrityError:
+        # Lost a race with another writer: fall back to row by row
+        db.session.rollback()
+    inserted = 0
+    for index, values in rows:
+        try:
+            _mark_changed(db.session, 'users')
+            db.session.execute(db.insert(UserModel), [values])
+            db.session.commit()
+            inserted += 1
+        except IntegrityError:
+            db.session.rollback()
+            errors.append({'row': index, 'error': "name or email already exists"})
+    return inserted, errors
+
+
+def _bulk_insert(rows, batch_size):
+    """Validate and insert rows batch by batch, yielding NDJSON progress lines"""
+    inserted = failed = batches = 0
+    batch = []
+
+    def flush():
+        nonlocal inserted, failed, batches
+        count, errors = _insert_batch(batch)
+        batches += 1
+        inserted += count
+        failed += len(errors)
+        lines = [json.dumps(error) + '\n' for error in errors]
+        lines.append(json.dumps({'batch': batches, 'inserted': count, 'failed': len(errors),
+                                 'total_inserted': inserted, 'total_failed': failed}) + '\n')
+        batch.clear()
+        return lines
+
+    for index, row, error in rows:
+        if error is None:
+            values, error = _validate_user(row)
+        if error is not None:
+            failed += 1
+            yield json.dumps({'row': index, 'error': error}) + '\n'
+            continue
+        batch.append((index, values))
+        if len(batch) >= batch_size:
+            yield from flush()
+    if batch:
+        yield from flush()
+    yield json.dumps({'done': True, 'inserted': inserted, 'failed': failed}) + '\n'
+
+
+@app.route('/api/users/bulk', methods=['POST'])
+def bulk_users():
+    """Create users from a JSON array or NDJSON body (Content-Type: application/x-ndjson).
+
+    Each batch of batch_size rows is committed in its own transaction. The
+    response streams NDJSON: one line per rejected row, one per committed
+    batch, and a final summary.
+    """
+    batch_size = max(1, request.args.get('batch_size', app.config['USERS_BULK_BATCH_SIZE'], type=int))
+    is_ndjson = request.mimetype in ('application/x-ndjson', 'application/jsonl')
+    rows = _bulk_rows(request.stream, is_ndjson)
+    return Response(stream_with_context(_bulk_insert(rows, batch_size)), mimetype='application/x-ndjson')
+
+@app.route('/api/cache')
+def cache_stats():
+    return jsonify(ResponseCache.combine(metrics.shared('cache')))
+
+@app.route('/api/metrics')
+def metrics_report():
+    return jsonify(endpoints=metrics.snapshot(), cache=ResponseCache.combine(metrics.shared('cache')))
+
+@app.route('/api/metrics/profiles')
+def slow_profiles():
+    """Stacks sampled from slow requests, in folded format for flame graph tools"""
+    return Response(metrics.folded_profiles(), mimetype='text/plain')
+
 @app.route('/')
 def home():
     return '<h1>Flask REST API</h1>'
@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+SIZES = (1000, 100000, 1000000)
+
+
+def seed(db, UserModel, count):
+    """Fill an empty user table with count users (some with non-ASCII names)"""
+    rows = [{'name': f"user{i}" if i % 10 else f"usér{i} \"q\"", 'email': f"user{i}@example.com"}
+            for i in range(count)]
+    db.session.execute(db.insert(UserModel), rows)
+    db.session.commit()
+
+
+def marshal_path(api, UserModel, marshal, userFields):
+    """The original listing: ORM objects -> marshal(userFields) -> output_json"""
+    users = UserModel.query.order_by(UserModel.id).all()
+    return api.make_response(marshal(users, userFields), 200).get_data()
+
+
+def tuple_path(rows_for, dump_users, count):
+    """Core select of (id, name, email) tuples encoded by dump_users"""
+    return dump_users(rows_for(0, count)).encode()
+
+
+def timed(function, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare marshal_with(userFields) with the tuple serializer")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)))
+    parser.add_argument("--repeat", default=3, type=int)
+    parser.add_argument("--output", default="serialization_results.json")
+    args = parser.parse_args()
+
+    # Each size gets its own scratch database; api reads DATABASE_URL at import
+    workdir = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    from flask_restful import marshal
+    from api import UserModel, _user_rows, api, app, db, userFields
+    from serialization import dump_users
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        with app.test_request_context():
+            db.drop_all()
+            db.create_all()
+            seed(db, UserModel, size)
+            old_seconds, old_body = timed(lambda: marshal_path(api, UserModel, marshal, userFields), args.repeat)
+            db.session.expunge_all()
+            new_seconds, new_body = timed(lambda: tuple_path(_user_rows, dump_users, size), args.repeat)
+        result = {
+            'rows': size,
+            'marshal_seconds': old_seconds,
+            'tuple_seconds': new_seconds,
+            'speedup': old_seconds / new_seconds,
+            'bytes': len(new_body),
+            'identical': old_body == new_body,
+        }
+        results.append(result)
+        print(f"{size:8d} rows  marshal {old_seconds:8.3f}s  tuples {new_seconds:8.3f}s  "
+              f"x{result['speedup']:5.1f}  identical={result['identical']}")
+
+    with open(args.output, "w") as f:
+        json.dump({'repeat': args.repeat, 'results': results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import json
+import os
+import sqlite3
+
+from sqlalchemy import event
+
+
+DEFAULTS = {
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///example.db',
+    'USERS_PAGE_SIZE': 50,
+    'USERS_MAX_PAGE_SIZE': 1000,
+    'USERS_EXPORT_BATCH_SIZE': 1000,
+    'USERS_BULK_BATCH_SIZE': 1000,
+    'RESPONSE_CACHE_TTL': 30,
+    'RESPONSE_CACHE_MAX_ENTRIES': 1024,
+    'RESPONSE_CACHE_MAX_BYTES': 64 * 1024 * 1024,
+    # Stack-sample requests slower than this many ms (None disables profiling)
+    'METRICS_PROFILE_SLOW_MS': None,
+    'METRICS_PROFILE_INTERVAL_MS': 5,
+    'METRICS_PROFILE_KEEP': 20,
+    # Directory where worker processes publish metrics for each other (wsgi.py
+    # picks a temporary one when unset), and how often they do
+    'METRICS_SHARED_DIR': None,
+    'METRICS_PUBLISH_INTERVAL': 1,
+    # Engine
+    'DB_POOL_SIZE': 5,
+    'DB_MAX_OVERFLOW': 10,
+    'DB_POOL_TIMEOUT': 30,
+    'DB_POOL_RECYCLE': 1800,
+    'DB_STATEMENT_CACHE_SIZE': 500,
+    'SQLITE_JOURNAL_MODE': 'WAL',
+    'SQLITE_SYNCHRONOUS': 'NORMAL',
+    'SQLITE_BUSY_TIMEOUT_MS': 5000,
+}
+
+
+def load_config(app):
+    """Fill app.config from DEFAULTS, then a JSON file, then the environment.
+
+    FLASK_API_CONFIG names an optional JSON file. Any FLASK_API_<KEY>
+    variable overrides <KEY> (values are parsed as JSON when possible), and
+    DATABASE_URL, if set, overrides the database URI.
+    """
+    app.config.from_mapping(DEFAULTS)
+    path = os.environ.get('FLASK_API_CONFIG')
+    if path:
+        app.config.from_file(os.path.abspath(path), load=json.load)
+    app.config.from_prefixed_env('FLASK_API')
+    if os.environ.get('DATABASE_URL'):
+        app.config['SQLALCHEMY_DATABASE_URI'] = os.environ['DATABASE_URL']
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+
+
+def engine_options(config):
+    """create_engine() keyword arguments for the configured database"""
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    # Compiled SQL is cached per engine; sqlite3 also keeps prepared statements per connection
+    options = {'query_cache_size': config['DB_STATEMENT_CACHE_SIZE']}
+    if uri.startswith('sqlite'):
+        options['connect_args'] = {
+            'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+            'cached_statements': config['DB_STATEMENT_CACHE_SIZE'],
+            'check_same_thread': False,
+        }
+        if ':memory:' in uri or uri.rstrip('/') in ('sqlite:', 'sqlite+pysqlite:'):
+            return options
+    else:
+        options.update(pool_pre_ping=True, pool_timeout=config['DB_POOL_TIMEOUT'])
+    options.update(pool_size=config['DB_POOL_SIZE'], max_overflow=config['DB_MAX_OVERFLOW'],
+                   pool_recycle=config['DB_POOL_RECYCLE'])
+    return options
+
+
+def configure_engine(engine, config):
+    """Apply the SQLite pragmas to every new connection of engine"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers run alongside the single writer; NORMAL is safe with WAL
+        cursor.execute(f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}")
+        cursor.execute(f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}")
+        cursor.close()
@@ -1,4 +1,25 @@
+from sqlalchemy import inspect
+
 from api import app, db
 
+
+def create_missing_indexes():
+    """Add model indexes to tables created before they were declared.
+
+    A column already covered by a unique constraint or index of the same
+    columns is left alone, so older databases do not get duplicate indexes.
+    """
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = {tuple(index['column_names']) for index in inspector.get_indexes(table.name)}
+        existing.update(tuple(constraint['column_names'])
+                        for constraint in inspector.get_unique_constraints(table.name))
+        for index in table.indexes:
+            if tuple(column.name for column in index.columns) not in existing:
+                index.create(db.engine)
+                print(f"Created index {index.name}")
+
+
 with app.app_context():
-    db.create_all()
\ No newline at end of file
+    db.create_all()
+    create_missing_indexes()
@@ -0,0 +1,31 @@
+import multiprocessing
+import os
+import shutil
+
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 2))
+# Import the app once in the master; each worker then only forks. Required:
+# the shared cache counter and metrics directory are created in wsgi.py
+preload_app = True
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    """Drop connections inherited from the master so workers never share a socket"""
+    from wsgi import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    """Publish the worker's last metrics so they outlive it"""
+    from wsgi import metrics
+    metrics.publish()
+
+
+def on_exit(server):
+    from wsgi import app, metrics
+    if not app.config['METRICS_SHARED_DIR']:
+        shutil.rmtree(metrics.shared_dir, ignore_errors=True)
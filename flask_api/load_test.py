@@ -0,0 +1,209 @@
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[index]
+
+
+def seed_users(db, UserModel, count, batch_size=10000):
+    """Insert count users named seed<i> through UserModel in large batches"""
+    for start in range(0, count, batch_size):
+        rows = [{'name': f"seed{i}", 'email': f"seed{i}@example.com"}
+                for i in range(start, min(count, start + batch_size))]
+        db.session.execute(db.insert(UserModel), rows)
+        db.session.commit()
+
+
+def start_local_server(app):
+    """Serve app from a threaded werkzeug server on a free port; returns (server, base_url)"""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    # HTTP/1.1 so each client thread can keep its connection open
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
+    # Per-request access logging would dominate the measured latency
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+class Worker:
+    """One client connection issuing a mix of listing, lookup and create requests"""
+
+    def __init__(self, base_url, seeded, get_ratio, conflict_ratio, rng):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        self.seeded = seeded
+        self.get_ratio = get_ratio
+        self.conflict_ratio = conflict_ratio
+        self.rng = rng
+
+    def request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            try:
+                self.connection.request(method, self.prefix + path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                response.read()
+                return response.status
+            except (http.client.HTTPException, OSError):
+                self.connection.close()
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+                if attempt:
+                    raise
+
+    def next_operation(self, sequence):
+        """(operation name, method, path, body) for the next request"""
+        rng = self.rng
+        if rng.random() < self.get_ratio:
+            if rng.random() < 0.5 or not self.seeded:
+                after = rng.randrange(max(1, self.seeded))
+                return 'list', 'GET', f"/api/users/?limit=50&after={after}", None
+            return 'get', 'GET', f"/api/users/{rng.randrange(1, self.seeded + 1)}", None
+        if self.seeded and rng.random() < self.conflict_ratio:
+            # Re-create an existing user to exercise the unique constraints
+            i = rng.randrange(self.seeded)
+            user = {'name': f"seed{i}", 'email': f"seed{i}@example.com"}
+            return 'create_conflict', 'POST', "/api/users/", json.dumps(user)
+        name = f"load{sequence}"
+        return 'create', 'POST', "/api/users/", json.dumps({'name': name, 'email': f"{name}@example.com"})
+
+
+def run_load(base_url, seeded, requests, concurrency, get_ratio, conflict_ratio, seed):
+    """Issue requests across concurrency threads; returns per-operation samples and wall time"""
+    counter = iter(range(requests))
+    lock = threading.Lock()
+    samples = []  # (operation, status or None, seconds)
+    run_id = f"{os.getpid()}_{int(time.time())}"
+
+    def client(index):
+        worker = Worker(base_url, seeded, get_ratio, conflict_ratio, random.Random(seed * 1000 + index))
+        local = []
+        while True:
+            with lock:
+                sequence = next(counter, None)
+            if sequence is None:
+                break
+            operation, method, path, body = worker.next_operation(f"{run_id}_{sequence}")
+            started = time.perf_counter()
+            try:
+                status = worker.request(method, path, body)
+            except (http.client.HTTPException, OSError):
+                status = None
+            local.append((operation, status, time.perf_counter() - started))
+        with lock:
+            samples.extend(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples, elapsed):
+    """Throughput, latency percentiles and error counts, overall and per operation"""
+    def stats(group):
+        latencies = sorted(seconds * 1000 for _, _, seconds in group)
+        statuses = Counter(str(status) for _, status, _ in group)
+        errors = sum(1 for _, status, _ in group if status is None or status >= 500)
+        conflicts = sum(1 for _, status, _ in group if status == 409)
+        return {
+            'requests': len(group),
+            'requests_per_second': len(group) / elapsed if elapsed else None,
+            'p50_ms': percentile(latencies, 0.50),
+            'p95_ms': percentile(latencies, 0.95),
+            'p99_ms': percentile(latencies, 0.99),
+            'max_ms': latencies[-1] if latencies else None,
+            'statuses': dict(statuses),
+            'error_rate': errors / len(group) if group else 0.0,
+            'conflicts': conflicts,
+            'conflict_rate': conflicts / len(group) if group else 0.0,
+        }
+
+    operations = sorted({operation for operation, _, _ in samples})
+    return {
+        'seconds': elapsed,
+        'overall': stats(samples),
+        'operations': {operation: stats([s for s in samples if s[0] == operation]) for operation in operations},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the users API with a mixed GET/POST workload")
+    parser.add_argument("--users", default=10000, type=int, help="users to seed before the run")
+    parser.add_argument("--requests", default=5000, type=int)
+    parser.add_argument("--concurrency", default=16, type=int)
+    parser.add_argument("--get-ratio", default=0.9, type=float, help="share of requests that are GETs")
+    parser.add_argument("--conflict-ratio", default=0.1, type=float,
+                        help="share of POSTs that reuse an existing name/email")
+    parser.add_argument("--url", help="test an already running server instead of a local stand-in")
+    parser.add_argument("--seed", default=0, type=int)
+    parser.add_argument("--output", default="load_test_results.json")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        base_url = args.url
+        seeded = args.users
+    else:
+        # A scratch SQLite database stands in for the real one; api reads DATABASE_URL at import
+        workdir = tempfile.mkdtemp()
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'load_test.db')}"
+        from api import UserModel, app, db
+        with app.app_context():
+            db.create_all()
+            seed_users(db, UserModel, args.users)
+        seeded = args.users
+        server, base_url = start_local_server(app)
+
+    print(f"Running {args.requests} requests against {base_url} with concurrency {args.concurrency}")
+    samples, elapsed = run_load(base_url, seeded, args.requests, args.concurrency,
+                                args.get_ratio, args.conflict_ratio, args.seed)
+    if server is not None:
+        server.shutdown()
+
+    report = summarize(samples, elapsed)
+    for operation, stats in [('overall', report['overall'])] + list(report['operations'].items()):
+        print(f"{operation:16s} {stats['requests']:7d} req {stats['requests_per_second']:9.1f} req/s  "
+              f"p50 {stats['p50_ms']:7.2f}  p95 {stats['p95_ms']:7.2f}  p99 {stats['p99_ms']:7.2f} ms  "
+              f"errors {stats['error_rate']:6.2%}  conflicts {stats['conflicts']}")
+
+    with open(args.output, "w") as f:
+        json.dump({
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'url': args.url,
+            'parameters': {key: value for key, value in vars(args).items() if key != 'output'},
+            **report,
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+import bisect
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SIZE_BUCKETS = (128, 1024, 8192, 65536, 524288, 4194304, 33554432)
+# Name pattern of the per-process files in a shared metrics directory
+SHARED_FILE = 'metrics-{}.json'
+
+
+class Histogram:
+    """Fixed-bucket histogram with approximate quantiles"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (None if empty)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else float('inf')
+        return float('inf')
+
+    def state(self):
+        return {'counts': list(self.counts), 'sum': self.sum}
+
+    def merge(self, state):
+        """Add another histogram's state() with the same bounds"""
+        for index, count in enumerate(state['counts']):
+            self.counts[index] += count
+        self.count += sum(state['counts'])
+        self.sum += state['sum']
+
+    def as_dict(self):
+        buckets = {str(bound): count for bound, count in zip(self.bounds, self.counts)}
+        buckets['+Inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': buckets,
+        }
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.sql_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+        self.sql_queries = 0
+        self.statuses = Counter()
+
+    def state(self):
+        return {
+            'latency_ms': self.latency_ms.state(),
+            'sql_ms': self.sql_ms.state(),
+            'response_bytes': self.response_bytes.state(),
+            'sql_queries': self.sql_queries,
+            'statuses': dict(self.statuses),
+        }
+
+    def merge(self, state):
+        self.latency_ms.merge(state['latency_ms'])
+        self.sql_ms.merge(state['sql_ms'])
+        self.response_bytes.merge(state['response_bytes'])
+        self.sql_queries += state['sql_queries']
+        # JSON turns the status codes into strings
+        self.statuses.update({int(status): count for status, count in state['statuses'].items()})
+
+    def as_dict(self):
+        return {
+            'requests': self.latency_ms.count,
+            'statuses': dict(self.statuses),
+            'latency_ms': self.latency_ms.as_dict(),
+            'sql_queries': self.sql_queries,
+            'sql_ms': self.sql_ms.as_dict(),
+            'response_bytes': self.response_bytes.as_dict(),
+        }
+
+
+class StackSampler:
+    """Background thread that samples the Python stacks of registered threads.
+
+    Samples are kept per request as folded stacks ("outer;inner count"),
+    the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.active = {}  # thread id -> Counter of folded stacks
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self, thread_id):
+        samples = Counter()
+        with self.lock:
+            self.active[thread_id] = samples
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='metrics-sampler', daemon=True)
+                self.thread.start()
+        return samples
+
+    def stop(self, thread_id):
+        with self.lock:
+            return self.active.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                if not self.active:
+                    self.thread = None
+                    return
+                targets = dict(self.active)
+            frames = sys._current_frames()
+            for thread_id, samples in targets.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    samples[self._fold(frame)] += 1
+
+    @staticmethod
+    def _fold(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+
+class Metrics:
+    """Per-endpoint latency, SQL and response size metrics for a Flask app.
+
+    Endpoints are keyed by method and URL rule. SQL statements are counted
+    and timed through the engine's cursor events and charged to the request
+    that issued them. With METRICS_PROFILE_SLOW_MS set, every request is
+    stack-sampled every METRICS_PROFILE_INTERVAL_MS and the samples of those
+    slower than the threshold are kept (the last METRICS_PROFILE_KEEP).
+
+    Each process only sees its own requests. After share(directory), a
+    background thread in every process publishes its state there within
+    METRICS_PUBLISH_INTERVAL seconds of a change, and reports merge all of
+    them.
+    """
+
+    def __init__(self, app=None, engine=None):
+        self.endpoints = {}
+        self.lock = threading.Lock()
+        self.slow_profiles = deque()
+        self.sampler = None
+        self.slow_ms = None
+        self.shared_dir = None
+        self.shared_stats = {}  # name -> callable returning a stats dict to publish
+        self.publish_interval = 1
+        self.dirty = False  # state changed since the last publish
+        self.publisher_pid = None  # process the publisher thread runs in
+        if app is not None:
+            self.init_app(app, engine)
+
+    def init_app(self, app, engine):
+        app.config.setdefault('METRICS_PROFILE_SLOW_MS', None)
+        app.config.setdefault('METRICS_PROFILE_INTERVAL_MS', 5)
+        app.config.setdefault('METRICS_PROFILE_KEEP', 20)
+        app.config.setdefault('METRICS_PUBLISH_INTERVAL', 1)
+        self.publish_interval = app.config['METRICS_PUBLISH_INTERVAL']
+        self.slow_ms = app.config['METRICS_PROFILE_SLOW_MS']
+        self.slow_profiles = deque(maxlen=app.config['METRICS_PROFILE_KEEP'])
+        if self.slow_ms is not None:
+            self.sampler = StackSampler(app.config['METRICS_PROFILE_INTERVAL_MS'] / 1000)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        # after_cursor_execute does not fire for a statement that raises
+        event.listen(engine, 'handle_error', self._handle_error)
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_sql_queries = 0
+        g.metrics_sql_seconds = 0.0
+        if self.sampler is not None:
+            g.metrics_thread = threading.get_ident()
+            self.sampler.start(g.metrics_thread)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.metrics_query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._charge_query(context)
+
+    def _handle_error(self, exception_context):
+        self._charge_query(exception_context.execution_context)
+
+    def _charge_query(self, context):
+        """Add a finished (or failed) statement to the current request's SQL totals"""
+        started = getattr(context, 'metrics_query_started', None)
+        if started is None:
+            return
+        context.metrics_query_started = None
+        elapsed = time.perf_counter() - started
+        if has_request_context() and 'metrics_started' in g:
+            g.metrics_sql_queries += 1
+            g.metrics_sql_seconds += elapsed
+
+    def _after_request(self, response):
+        rule = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        key = f"{request.method} {rule}"
+        # The request's g and URL, still needed if the body outlives the request context
+        state = g._get_current_object()
+        url = request.url
+        if not response.is_streamed:
+            self._record(key, response.status_code, response.calculate_content_length() or 0, state, url)
+            return response
+
+        # Streamed bodies are produced after this hook; record once the last chunk is sent
+        body = response.response
+        status = response.status_code
+
+        def counted():
+            size = 0
+            try:
+                for chunk in body:
+                    size += len(chunk)
+                    yield chunk
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+                self._record(key, status, size, state, url)
+
+        response.response = counted()
+        return response
+
+    def _record(self, key, status, size, state, url):
+        if 'metrics_started' not in state:
+            return
+        elapsed_ms = (time.perf_counter() - state.metrics_started) * 1000
+        sql_queries = state.metrics_sql_queries
+        sql_ms = state.metrics_sql_seconds * 1000
+        samples = None
+        if self.sampler is not None and 'metrics_thread' in state:
+            samples = self.sampler.stop(state.metrics_thread)
+        with self.lock:
+            metrics = self.endpoints.get(key)
+            if metrics is None:
+                metrics = self.endpoints[key] = EndpointMetrics()
+            metrics.latency_ms.observe(elapsed_ms)
+            metrics.sql_ms.observe(sql_ms)
+            metrics.sql_queries += sql_queries
+            metrics.response_bytes.observe(size)
+            metrics.statuses[status] += 1
+            if samples and elapsed_ms >= self.slow_ms:
+                self.slow_profiles.append({
+                    'endpoint': key,
+                    'url': url,
+                    'latency_ms': elapsed_ms,
+                    'sql_queries': sql_queries,
+                    'stacks': dict(samples),
+                })
+        if self.shared_dir is not None:
+            self.dirty = True
+            self._start_publisher()
+
+    def _start_publisher(self):
+        # Threads do not survive fork, so each worker starts its own
+        if self.publisher_pid == os.getpid():
+            return
+        with self.lock:
+            if self.publisher_pid == os.getpid():
+                return
+            self.publisher_pid = os.getpid()
+        threading.Thread(target=self._publish_loop, name='metrics-publisher', daemon=True).start()
+
+    def _publish_loop(self):
+        while True:
+            time.sleep(self.publish_interval)
+            if self.dirty:
+                self.dirty = False
+                try:
+                    self.publish()
+                except OSError:
+                    self.dirty = True
+
+    def add_stats(self, name, collect):
+        """Report collect()'s dict under name from every process (see shared())"""
+        self.shared_stats[name] = collect
+
+    def share(self, directory):
+        """Publish to and merge from directory, shared by all worker processes.
+
+        Call it before forking; files left by an earlier run are removed.
+        Only files named like SHARED_FILE are written, read or removed.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, SHARED_FILE.format('*'))):
+            os.remove(path)
+        self.shared_dir = directory
+
+    def _state(self):
+        with self.lock:
+            return {
+                'endpoints': {key: metrics.state() for key, metrics in self.endpoints.items()},
+                'profiles': list(self.slow_profiles),
+                'stats': {name: collect() for name, collect in self.shared_stats.items()},
+            }
+
+    def publish(self):
+        """Write this process's state to the shared directory"""
+        path = os.path.join(self.shared_dir, SHARED_FILE.format(os.getpid()))
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self._state(), f)
+        os.replace(tmp, path)
+
+    def _states(self):
+        """This process's live state plus the last one published by every other process"""
+        states = [self._state()]
+        if self.shared_dir is None:
+            return states
+        own = SHARED_FILE.format(os.getpid())
+        for path in glob.glob(os.path.join(self.shared_dir, SHARED_FILE.format('*'))):
+            if os.path.basename(path) == own:
+                continue
+            try:
+                with open(path) as f:
+                    states.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return states
+
+    def shared(self, name):
+        """The stats dicts published under name by every process"""
+        return [state['stats'][name] for state in self._states() if name in state['stats']]
+
+    def snapshot(self):
+        endpoints = {}
+        for state in self._states():
+            for key, metrics in state['endpoints'].items():
+                endpoints.setdefault(key, EndpointMetrics()).merge(metrics)
+        return {key: metrics.as_dict() for key, metrics in sorted(endpoints.items())}
+
+    def folded_profiles(self):
+        """All kept slow-request samples merged into one folded-stack text"""
+        merged = Counter()
+        for state in self._states():
+            for profile in state['profiles']:
+                merged.update(profile['stacks'])
+        return ''.join(f"{stack} {count}\n" for stack, count in merged.most_common())
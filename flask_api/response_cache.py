@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheBackend:
+    """Storage interface used by ResponseCache.
+
+    Subclass it to put responses somewhere other than process memory (a
+    shared store, or a stand-in for one in tests).
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl, size=0):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """In-process store with per-entry TTL and LRU eviction by count and bytes"""
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (expires_at, size, value)
+        self.bytes = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, key, value, ttl, size=0):
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + ttl, size, value)
+            self.bytes += size
+            while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def delete(self, key):
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def _remove(self, key):
+        self.bytes -= self.entries.pop(key)[1]
+
+
+class CachedResponse:
+    def __init__(self, body, status, headers, etag):
+        self.body = body
+        self.status = status
+        self.headers = headers
+        self.etag = etag
+
+
+class ResponseCache:
+    """Tagged response cache in front of a CacheBackend.
+
+    Entries are stored under a key (the request URL) with a set of tags;
+    invalidate(tag) drops every entry carrying that tag. A response built
+    while an invalidation happened is not stored (see generation), so a slow
+    read cannot put stale data back after a write. The tag index lives
+    in this process; see share_generation() for invalidating across worker
+    processes.
+    """
+
+    def __init__(self, backend=None, ttl=30):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.tags = {}  # tag -> set of keys
+        self.generation = 0  # bumped by every invalidation
+        self.shared_generation = None  # counter shared with sibling processes
+        self.seen_shared = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        self.bytes_saved = 0
+
+    def share_generation(self, counter):
+        """Invalidate across the processes forked after this call.
+
+        counter is a multiprocessing.Value('Q') created before forking. Every
+        invalidation bumps it, and a process that sees it move drops all of
+        its entries, since it cannot tell which tags the other process hit.
+        """
+        self.shared_generation = counter
+        self.seen_shared = counter.value
+
+    def _sync(self):
+        if self.shared_generation is None:
+            return
+        value = self.shared_generation.value
+        if value == self.seen_shared:
+            return
+        with self.lock:
+            self.seen_shared = value
+            self.generation += 1
+            self.tags.clear()
+        self.backend.clear()
+
+    def get(self, key):
+        self._sync()
+        entry = self.backend.get(key)
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def record_not_modified(self, size):
+        """Count a 304 reply that spared sending a size-byte body"""
+        with self.lock:
+            self.not_modified += 1
+            self.bytes_saved += size
+
+    def set(self, key, entry, tags=(), generation=None):
+        """Store entry unless an invalidation happened since generation was read"""
+        self._sync()
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+        self.backend.set(key, entry, self.ttl, size=len(entry.body))
+        with self.lock:
+            for tag in tags:
+                self.tags.setdefault(tag, set()).add(key)
+
+    def invalidate(self, *tags):
+        with self.lock:
+            self.generation += 1
+            keys = set()
+            for tag in tags:
+                keys.update(self.tags.pop(tag, ()))
+        for key in keys:
+            self.backend.delete(key)
+        with self.lock:
+            self.invalidations += len(keys)
+        if self.shared_generation is not None:
+            with self.shared_generation.get_lock():
+                self.shared_generation.value += 1
+                value = self.shared_generation.value
+            with self.lock:
+                # Only our own bump: other processes' writes still need a _sync
+                if value == self.seen_shared + 1:
+                    self.seen_shared = value
+
+    def clear(self):
+        with self.lock:
+            self.tags.clear()
+        self.backend.clear()
+
+    @staticmethod
+    def combine(stats):
+        """Sum stats() dicts from several processes"""
+        total = {}
+        for item in stats:
+            for name, value in item.items():
+                total[name] = total.get(name, 0) + value
+        lookups = total.get('hits', 0) + total.get('misses', 0)
+        total['hit_ratio'] = total.get('hits', 0) / lookups if lookups else 0.0
+        return total
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        stats = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'not_modified': self.not_modified,
+            'invalidations': self.invalidations,
+            'bytes_saved': self.bytes_saved,
+        }
+        if isinstance(self.backend, MemoryBackend):
+            stats.update(entries=len(self.backend.entries), bytes=self.backend.bytes,
+                         evictions=self.backend.evictions)
+        return stats
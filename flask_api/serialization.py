@@ -0,0 +1,80 @@
+import json
+from json.encoder import encode_basestring_ascii
+
+from flask import current_app
+
+
+# One user as marshal_with(userFields) + flask_restful's output_json write it
+_USER = '{"id": %d, "name": %s, "email": %s}'
+
+
+def _string(value):
+    """fields.String then json.dumps: str() the value, None stays null"""
+    return 'null' if value is None else encode_basestring_ascii(str(value))
+
+
+def _custom_settings():
+    """flask_restful's json.dumps settings when they differ from the defaults"""
+    settings = dict(current_app.config.get('RESTFUL_JSON', {}))
+    if current_app.debug:
+        settings.setdefault('indent', 4)
+    return settings
+
+
+def _user_dicts(rows):
+    return [{'id': int(user_id), 'name': None if name is None else str(name),
+             'email': None if email is None else str(email)} for user_id, name, email in rows]
+
+
+def _encode_rows(rows):
+    return ', '.join([_USER % (user_id, _string(name), _string(email)) for user_id, name, email in rows])
+
+
+def dump_users(rows):
+    """JSON for [(id, name, email), ...], byte-identical to marshal_with(userFields).
+
+    Rows come straight from a Core select, so no ORM objects or per-field
+    marshalling are built. Falls back to json.dumps when RESTFUL_JSON or
+    debug mode change the output format.
+    """
+    settings = _custom_settings()
+    if settings:
+        return json.dumps(_user_dicts(rows), **settings) + '\n'
+    return '[' + _encode_rows(rows) + ']\n'
+
+
+def stream_users(batches):
+    """Yield the dump_users() text of all rows in an iterable of row batches"""
+    settings = _custom_settings()
+    if settings:
+        yield from _stream_custom(batches, settings)
+        return
+    yield '['
+    first = True
+    for batch in batches:
+        if not batch:
+            continue
+        yield ('' if first else ', ') + _encode_rows(batch)
+        first = False
+    yield ']\n'
+
+
+def _stream_custom(batches, settings):
+    """stream_users() for RESTFUL_JSON/debug settings, one batch at a time.
+
+    Each user is json.dumps of a one-user list with the brackets (and, when
+    indenting, the closing newline) cut off; json.dumps joins list items
+    the same way, so the result matches dump_users() byte-for-byte.
+    """
+    indent = settings.get('indent')
+    closing = '' if indent is None else '\n'
+    separator = settings.get('separators', (', ' if indent is None else ',', ': '))[0]
+    yield '['
+    first = True
+    for batch in batches:
+        pieces = [json.dumps([user], **settings)[1:-1 - len(closing)] for user in _user_dicts(batch)]
+        if not pieces:
+            continue
+        yield ('' if first else separator) + separator.join(pieces)
+        first = False
+    yield ('' if first else closing) + ']\n'
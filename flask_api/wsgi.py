@@ -0,0 +1,24 @@
+"""WSGI entry point for production servers, e.g.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The development server in api.py runs a single process; gunicorn runs
+several workers so requests are served across all cores.
+
+Each worker keeps its own response cache and metrics. So that a write in
+one worker is not served stale by the others, they share an invalidation
+counter: any write bumps it and every worker drops its whole cache the
+next time it reads the counter (up to RESPONSE_CACHE_MAX_ENTRIES misses
+per worker, never a stale hit). A background thread in each worker
+publishes its metrics to METRICS_SHARED_DIR (a temporary directory by
+default) within METRICS_PUBLISH_INTERVAL seconds of a request, and
+/api/metrics, /api/cache and /api/metrics/profiles merge all workers. Both are set up here, before the
+fork, so they need preload_app (on in gunicorn.conf.py).
+"""
+import multiprocessing
+import tempfile
+
+from api import app, db, metrics, response_cache
+
+response_cache.share_generation(multiprocessing.Value('Q', 0))
+metrics.share(app.config['METRICS_SHARED_DIR'] or tempfile.mkdtemp(prefix='flask_api_metrics_'))
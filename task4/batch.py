@@ -0,0 +1,174 @@
+import asyncio
+import os
+import sys
+import time
+
+from psycopg import sql
+from psycopg_pool import AsyncConnectionPool
+
+from catalog import CATALOG_QUERY, database_id
+from show_table import CTID_KEY, RELATION_BLOCKS_QUERY, ctid_windows, export_query, page_query, paging_key
+from update_table import (ChangeBatches, batch_stats, drop_stage_query, report_bulk_update, stage_copy_query,
+                          stage_queries, update_query)
+
+CONCURRENCY = 4
+CONNECT_TIMEOUT = 10
+
+
+async def load_catalog(pool, catalog):
+    """Fill the schema cache over a pooled connection unless it is still fresh"""
+    async with pool.connection() as conn:
+        if catalog.needs_refresh(database_id(conn)):
+            async with conn.cursor() as cur:
+                await cur.execute(CATALOG_QUERY)
+                catalog.store(await cur.fetchall(), database_id(conn))
+
+
+async def show_one(pool, catalog, table, limit):
+    info = catalog.tables[table]
+    key = paging_key(info.primary_key, info.kind)
+    skip = len(key[0]) if key is not None else 0
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            if key is CTID_KEY:
+                await cur.execute(RELATION_BLOCKS_QUERY, [sql.Identifier(table).as_string(cur)])
+                blocks = (await cur.fetchone())[0]
+                for window in ctid_windows(None, True, blocks):
+                    await cur.execute(*page_query(table, key, page_size=limit, blocks=window))
+                    rows = await cur.fetchall()
+                    if len(rows) >= limit:
+                        break
+            else:
+                await cur.execute(*page_query(table, key, page_size=limit))
+                rows = await cur.fetchall()
+            cols = [d[0] for d in cur.description[skip:]]
+
+    # Print each table's block in one go so concurrent results do not interleave
+    lines = [f"== {table} ==", " | ".join(cols), '-' * max(10, len(" | ".join(cols)))]
+    lines.extend(str(r[skip:]) for r in rows)
+    if not rows:
+        lines.append(f"Table '{table}' is empty.")
+    print("\n".join(lines))
+    return {'rows': len(rows), 'bytes': 0}
+
+
+async def export_one(pool, table, fmt, out_dir):
+    path = os.path.join(out_dir, f"{table}.{fmt}")
+    size = 0
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            with open(path, 'wb') as out:
+                async with cur.copy(export_query(table, fmt)) as copy:
+                    async for data in copy:
+                        out.write(data)
+                        size += len(data)
+            rows = cur.rowcount
+    print(f"{table}: exported {rows} row(s) to {path}")
+    return {'rows': rows, 'bytes': size}
+
+
+async def update_one(pool, catalog, table, source, batch_size):
+    info = catalog.tables[table]
+    pk_cols, types = info.primary_key, info.columns
+    changes = ChangeBatches(source, pk_cols, types, batch_size)
+    batches = []
+    async with pool.connection() as conn:
+        async with conn.cursor() as cur:
+            for query in stage_queries(table, pk_cols):
+                await cur.execute(query)
+            copy_query = stage_copy_query(pk_cols)
+            for rows, columns in changes:
+                started = time.perf_counter()
+                async with cur.copy(copy_query) as copy:
+                    for row in rows:
+                        await copy.write_row(row)
+                copied = time.perf_counter()
+                await cur.execute(update_query(table, pk_cols, columns, types))
+                updated = cur.rowcount
+                await conn.commit()
+                batches.append(batch_stats(len(batches) + 1, len(rows), updated, started, copied,
+                                           time.perf_counter(), table))
+            await cur.execute(drop_stage_query())
+    report_bulk_update(batches, changes.rejected, table)
+    return {'rows': sum(b['rows_updated'] for b in batches), 'bytes': 0}
+
+
+def _open_changes(path):
+    return sys.stdin if path == '-' else open(path, newline='')
+
+
+async def _run(conn_str, catalog, args):
+    # Each operation holds one pooled connection; the semaphore keeps waiting
+    # operations out of the pool queue so long exports cannot time them out
+    limit = asyncio.Semaphore(args.concurrency)
+    async with AsyncConnectionPool(conn_str, min_size=1, max_size=args.concurrency, open=False) as pool:
+        # Fail fast, like psycopg.connect, instead of retrying an unreachable server
+        await pool.wait(timeout=CONNECT_TIMEOUT)
+        await load_catalog(pool, catalog)
+        lookup = {name.lower(): name for name in catalog.tables}
+
+        if args.command == 'update':
+            targets = []
+            for spec in args.changes:
+                table, sep, path = spec.partition('=')
+                if not sep:
+                    print(f"Expected TABLE=FILE, got {spec!r}")
+                    return 1
+                targets.append((table, path))
+        else:
+            targets = [(table, None) for table in args.tables]
+
+        async def run_one(table, path):
+            real_name = lookup.get(table.lower())
+            if real_name is None:
+                print(f"{table}: Table not found in the database")
+                return None
+            async with limit:
+                started = time.perf_counter()
+                if args.command == 'show':
+                    result = await show_one(pool, catalog, real_name, args.limit)
+                elif args.command == 'export':
+                    result = await export_one(pool, real_name, args.format, args.out_dir)
+                else:
+                    source = _open_changes(path)
+                    try:
+                        result = await update_one(pool, catalog, real_name, source, args.batch_size)
+                    finally:
+                        if source is not sys.stdin:
+                            source.close()
+                result['seconds'] = time.perf_counter() - started
+                return result
+
+        if args.command == 'export':
+            os.makedirs(args.out_dir, exist_ok=True)
+        started = time.perf_counter()
+        results = await asyncio.gather(*(run_one(table, path) for table, path in targets), return_exceptions=True)
+        elapsed = time.perf_counter() - started
+
+    failed = 0
+    for (table, _), result in zip(targets, results):
+        if isinstance(result, BaseException):
+            print(f"{table}: Error: {result}")
+        if result is None or isinstance(result, BaseException):
+            failed += 1
+    done = [r for r in results if isinstance(r, dict)]
+    rows = sum(r['rows'] for r in done)
+    size = sum(r['bytes'] for r in done)
+    rate = f"{rows / elapsed:.0f} rows/s" if elapsed else "n/a"
+    if size:
+        rate += f", {size / elapsed / 1e6:.1f} MB/s" if elapsed else ""
+    print(f"{len(done)} of {len(targets)} operation(s) done: {rows} row(s) in {elapsed:.2f}s ({rate}) "
+          f"on up to {args.concurrency} connection(s)")
+    return 1 if failed else 0
+
+
+def run_async(coroutine):
+    if sys.platform == 'win32':
+        # psycopg's async connections need a selector event loop on Windows
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    return asyncio.run(coroutine)
+
+
+def run_command(conn_str, catalog, args):
+    """Run a show/export/update subcommand; returns the process exit code"""
+    return run_async(_run(conn_str, catalog, args))
@@ -0,0 +1,163 @@
+import json
+import os
+import time
+
+CATALOG_TTL = 300
+
+# Every public table with its columns, types and primary key, in one round trip.
+# Relation kinds match information_schema.tables: tables, partitioned tables,
+# views and foreign tables.
+CATALOG_QUERY = """
+    SELECT c.relname,
+           c.relkind,
+           c.relispartition,
+           c.reltuples::bigint,
+           a.attname,
+           format_type(a.atttypid, a.atttypmod),
+           array_position(i.indkey::int2[], a.attnum)
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_attribute a
+      ON a.attrelid = c.oid
+     AND a.attnum > 0
+     AND NOT a.attisdropped
+    LEFT JOIN pg_index i
+      ON i.indrelid = c.oid
+     AND i.indisprimary
+    WHERE n.nspname = 'public'
+      AND c.relkind IN ('r', 'p', 'v', 'f')
+    ORDER BY c.relname, a.attnum;
+"""
+
+
+def database_id(conn):
+    """host:port/dbname of a (sync or async) connection"""
+    info = conn.info
+    return f"{info.host}:{info.port}/{info.dbname}"
+
+
+class TableInfo:
+    def __init__(self, name, estimated_rows=0, columns=None, primary_key=None, kind='r', partition=False):
+        self.name = name
+        self.kind = kind  # pg_class.relkind: r table, p partitioned table, v view, f foreign table
+        self.partition = partition  # a partition of some partitioned table
+        self.estimated_rows = estimated_rows
+        self.columns = columns if columns is not None else {}  # column -> SQL type, in table order
+        self.primary_key = primary_key if primary_key is not None else []
+
+    def as_dict(self):
+        return {
+            'kind': self.kind,
+            'partition': self.partition,
+            'estimated_rows': self.estimated_rows,
+            'columns': self.columns,
+            'primary_key': self.primary_key,
+        }
+
+
+class SchemaCache:
+    """In-memory copy of the public schema's tables, columns, types and keys.
+
+    Loaded from pg_catalog with a single query and reloaded when older than
+    ttl seconds or after invalidate(). With a path, the snapshot is also
+    written to and read from that JSON file, so a fresh process can start
+    without querying the catalog; the file is only trusted for the same
+    database and within the TTL.
+    """
+
+    def __init__(self, ttl=CATALOG_TTL, path=None):
+        self.ttl = ttl
+        self.path = path
+        self.tables = {}
+        self.loaded_at = None
+        self.database = None
+        self._file_checked = False
+
+    def invalidate(self):
+        """Drop the snapshot; the next lookup reloads it from pg_catalog"""
+        self.loaded_at = None
+
+    def _fresh(self):
+        return self.loaded_at is not None and time.time() - self.loaded_at < self.ttl
+
+    def needs_refresh(self, database):
+        """Whether CATALOG_QUERY must be run; tries the persisted file first"""
+        if self._fresh() and self.database == database:
+            return False
+        if not self._file_checked:
+            self._file_checked = True
+            if self.path and self._load_file(database):
+                return False
+        return True
+
+    def _ensure(self, cur):
+        if self.needs_refresh(database_id(cur.connection)):
+            self.refresh(cur)
+
+    def refresh(self, cur):
+        """Reload everything from pg_catalog in one query"""
+        cur.execute(CATALOG_QUERY)
+        self.store(cur.fetchall(), database_id(cur.connection))
+
+    def store(self, rows, database):
+        """Replace the snapshot with CATALOG_QUERY result rows"""
+        tables = {}
+        for relname, relkind, relispartition, reltuples, attname, type_name, pk_position in rows:
+            table = tables.get(relname)
+            if table is None:
+                table = tables[relname] = TableInfo(relname, max(0, reltuples), kind=relkind,
+                                                    partition=relispartition)
+            if attname is None:
+                continue
+            table.columns[attname] = type_name
+            if pk_position is not None:
+                table.primary_key.append((pk_position, attname))
+        for table in tables.values():
+            table.primary_key = [name for _, name in sorted(table.primary_key)]
+
+        self.tables = tables
+        self.loaded_at = time.time()
+        self.database = database
+        if self.path:
+            self._save_file()
+
+    def _save_file(self):
+        payload = {
+            'database': self.database,
+            'loaded_at': self.loaded_at,
+            'tables': {name: table.as_dict() for name, table in self.tables.items()},
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp, self.path)
+
+    def _load_file(self, database):
+        try:
+            with open(self.path) as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if payload.get('database') != database or time.time() - payload.get('loaded_at', 0) >= self.ttl:
+            return False
+        self.tables = {name: TableInfo(name, **info) for name, info in payload['tables'].items()}
+        self.loaded_at = payload['loaded_at']
+        self.database = database
+        return True
+
+    def table_names(self, cur):
+        self._ensure(cur)
+        return sorted(self.tables)
+
+    def table(self, cur, name):
+        """TableInfo for name, or None if the table does not exist"""
+        self._ensure(cur)
+        return self.tables.get(name)
+
+    def primary_key(self, cur, name):
+        table = self.table(cur, name)
+        return list(table.primary_key) if table is not None else []
+
+    def column_types(self, cur, name):
+        table = self.table(cur, name)
+        return dict(table.columns) if table is not None else {}
@@ -2,8 +2,11 @@ import psycopg
 import argparse
 import sys
 
-from show_table import show_table
-from update_table import update_table
+from batch import CONCURRENCY, run_command
+from catalog import CATALOG_TTL, SchemaCache
+from show_table import EXPORT_FORMATS, ITERSIZE, PAGE_SIZE, show_table
+from snapshot import CHUNK_ROWS, COMPRESS_LEVEL, SNAPSHOT_FORMATS, run_snapshot
+from update_table import BULK_BATCH_SIZE, update_table
 
 HOST = "localhost"
 PORT = 5432
@@ -18,24 +21,57 @@ def main():
     parser.add_argument("--dbname", default=DBNAME)
     parser.add_argument("--user", default=USER)
     parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--page-size", default=PAGE_SIZE, type=int, help="rows per page in Show Table")
+    parser.add_argument("--itersize", default=ITERSIZE, type=int,
+                        help="rows fetched per round trip when streaming a whole table")
+    parser.add_argument("--catalog-ttl", default=CATALOG_TTL, type=float,
+                        help="seconds before cached table/column metadata is reloaded")
+    parser.add_argument("--catalog-cache", help="JSON file to persist table/column metadata between runs")
+
+    # Non-interactive commands; without one the interactive menu runs
+    pooled = argparse.ArgumentParser(add_help=False)
+    pooled.add_argument("--concurrency", default=CONCURRENCY, type=int,
+                        help="tables processed at once, each on its own pooled connection")
+    commands = parser.add_subparsers(dest="command")
+    show_cmd = commands.add_parser("show", parents=[pooled], help="print the first rows of tables")
+    show_cmd.add_argument("tables", nargs="+")
+    show_cmd.add_argument("--limit", default=PAGE_SIZE, type=int)
+    export_cmd = commands.add_parser("export", parents=[pooled], help="export tables with COPY")
+    export_cmd.add_argument("tables", nargs="+")
+    export_cmd.add_argument("--format", default="csv", choices=EXPORT_FORMATS)
+    export_cmd.add_argument("--out-dir", default=".")
+    update_cmd = commands.add_parser("update", parents=[pooled], help="apply bulk changes from CSV files")
+    update_cmd.add_argument("changes", nargs="+", metavar="TABLE=FILE",
+                            help="changes CSV for a table ('-' reads stdin)")
+    update_cmd.add_argument("--batch-size", default=BULK_BATCH_SIZE, type=int)
+    snapshot_cmd = commands.add_parser("snapshot", parents=[pooled],
+                                       help="export every table from one consistent snapshot")
+    snapshot_cmd.add_argument("tables", nargs="*", help="tables to include (default: all)")
+    snapshot_cmd.add_argument("--format", default="csv", choices=SNAPSHOT_FORMATS)
+    snapshot_cmd.add_argument("--out-dir", default="backup")
+    snapshot_cmd.add_argument("--compress", action="store_true", help="gzip each chunk file")
+    snapshot_cmd.add_argument("--compress-level", default=COMPRESS_LEVEL, type=int, choices=range(1, 10))
+    snapshot_cmd.add_argument("--chunk-rows", default=CHUNK_ROWS, type=int,
+                              help="split tables estimated larger than this into concurrent chunks")
     args = parser.parse_args()
 
     conn_str = f"host={args.host} port={args.port} dbname={args.dbname} user={args.user} password={args.password}"
+    catalog = SchemaCache(ttl=args.catalog_ttl, path=args.catalog_cache)
+
+    if args.command:
+        try:
+            if args.command == 'snapshot':
+                sys.exit(run_snapshot(conn_str, catalog, args))
+            sys.exit(run_command(conn_str, catalog, args))
+        except Exception as e:
+            print("Error:", e)
+            sys.exit(1)
 
     try:
         with psycopg.connect(conn_str) as conn:
             with conn.cursor() as cur:
                 # List tables in the public schema
-                cur.execute(
-                    """
-                    SELECT table_name
-                    FROM information_schema.tables
-                    WHERE table_schema = 'public'
-                    ORDER BY table_name;
-                    """
-                )
-                tables = cur.fetchall()
-                table_names = [t[0] for t in tables]
+                table_names = catalog.table_names(cur)
                 if not table_names:
                     print("No tables found in public schema.")
                 else:
@@ -47,14 +83,22 @@ def main():
                     print("Menu:")
                     print("1. Show Table")
                     print("2. Update Table")
+                    print("3. Refresh Schema Cache")
                     print("q. Quit")
-                    choice = input("Choose an option: ").strip()
+                    try:
+                        choice = input("Choose an option: ").strip()
+                    except EOFError:
+                        choice = 'q'
 
                     if choice == '1':
-                        show_table(cur, table_names)
+                        show_table(cur, catalog, args.page_size, args.itersize)
 
                     elif choice == '2':
-                        update_table(cur, table_names)
+                        update_table(cur, catalog)
+
+                    elif choice == '3':
+                        catalog.invalidate()
+                        print("Tables:", catalog.table_names(cur))
 
                     elif choice.lower() in ('q', 'quit', 'exit'):
                         print("Goodbye!")
@@ -1,28 +1,237 @@
 import sys
 from psycopg import sql
 
+PAGE_SIZE = 50
+ITERSIZE = 2000
+EXPORT_FORMATS = ('csv', 'ndjson')
+# Heap blocks read for a ctid page at first; doubled until the page fills
+CTID_WINDOW = 64
+RELATION_BLOCKS_QUERY = "SELECT pg_relation_size(%s::regclass) / current_setting('block_size')::int"
+CTID_KEY = ([sql.SQL('ctid')], sql.SQL('%s::tid'))
 
-def _print_rows_with_header(cur, rows):
+
+def _print_rows_with_header(cur, rows, skip=0):
+    """Print rows under a header; skip leading key columns added for paging"""
     if cur.description:
-        cols = [d[0] for d in cur.description]
+        cols = [d[0] for d in cur.description[skip:]]
         print(" | ".join(cols))
         print('-' * max(10, len(" | ".join(cols))))
     for r in rows:
-        print(r)
+        print(r[skip:] if skip else r)
 
 
-def show_table(cur, table_names):
-    tbl = input("Enter table name: ").strip()
-    lookup = {name.lower(): name for name in table_names}
-    if tbl.lower() in lookup:
-        real_name = lookup[tbl.lower()]
-        query = sql.SQL("SELECT * FROM {} LIMIT 50;").format(sql.Identifier(real_name))
-        cur.execute(query)
+def paging_key(pk_cols, kind='r'):
+    """Columns to keyset-page on: the primary key, or ctid when there is none.
+
+    Only plain tables (relkind 'r') have a usable ctid: views and foreign
+    tables have none and it is not unique across a partitioned table, so
+    those get None and are paged by OFFSET instead.
+    """
+    if pk_cols:
+        return [sql.Identifier(c) for c in pk_cols], sql.SQL('%s')
+    if kind == 'r':
+        return CTID_KEY
+    return None
+
+
+def _tid(block):
+    return sql.SQL('{}::tid').format(sql.Literal(f"({block},0)"))
+
+
+def _tid_block(value):
+    """Block number of a ctid value, as psycopg returns it ('(block,offset)')"""
+    return int(str(value).strip('()').split(',')[0])
+
+
+def ctid_windows(boundary, forward, blocks):
+    """(first_block, end_block) ranges to try, each twice as wide, for one ctid page.
+
+    The planner does not treat TID range scans as ordered, so ORDER BY ctid
+    sorts every row the range matches; bounding the range to a few blocks
+    past the boundary keeps that sort near one page instead of the rest of
+    the table. end_block None means to the end of the table; the last range
+    covers everything left in that direction. blocks is the table's size.
+    """
+    window = CTID_WINDOW
+    if boundary is None:
+        block = 0
+    else:
+        block = _tid_block(boundary[0])
+    while True:
+        if forward:
+            if block + window >= blocks:
+                yield block, None
+                return
+            yield block, block + window
+        else:
+            first = max(0, block - window)
+            # The boundary's own block may still hold earlier rows
+            yield first, block + 1
+            if first == 0:
+                return
+        window *= 2
+
+
+def page_query(table, key, boundary=None, forward=True, page_size=PAGE_SIZE, blocks=None):
+    """(query, params) selecting one keyset page of (key..., *row) tuples.
+
+    boundary is the key of the last (or first) row of the current page;
+    None starts from the beginning. With a primary key each page is an
+    index seek, so paging deep into a table costs the same as the first
+    page; ctid pages should be limited to a (first_block, end_block) range
+    (see ctid_windows). Backward pages come out in descending key order.
+
+    With key None, boundary is the row offset of the page instead (plain
+    OFFSET/LIMIT, in whatever order the relation returns rows).
+    """
+    if key is None:
+        offset = sql.SQL(' OFFSET {}').format(sql.Literal(boundary)) if boundary else sql.SQL('')
+        query = sql.SQL('SELECT * FROM {}{} LIMIT {}').format(
+            sql.Identifier(table), offset, sql.Literal(page_size)
+        )
+        return query, []
+    key_cols, placeholder = key
+    keys = sql.SQL(', ').join(key_cols)
+    direction = sql.SQL('' if forward else ' DESC')
+    order = sql.SQL(', ').join(sql.SQL('{}{}').format(c, direction) for c in key_cols)
+    conditions = []
+    params = []
+    if boundary is not None:
+        conditions.append(sql.SQL('({}) {} ({})').format(
+            keys,
+            sql.SQL('>' if forward else '<'),
+            sql.SQL(', ').join([placeholder] * len(key_cols)),
+        ))
+        params = list(boundary)
+    if blocks is not None:
+        first, end = blocks
+        conditions.append(sql.SQL('ctid >= {}').format(_tid(first)))
+        if end is not None:
+            conditions.append(sql.SQL('ctid < {}').format(_tid(end)))
+    where = sql.SQL('')
+    if conditions:
+        where = sql.SQL(' WHERE {}').format(sql.SQL(' AND ').join(conditions))
+    query = sql.SQL('SELECT {}, * FROM {}{} ORDER BY {} LIMIT {}').format(
+        keys, sql.Identifier(table), where, order, sql.Literal(page_size)
+    )
+    return query, params
+
+
+def fetch_page(cur, table, key, boundary=None, forward=True, page_size=PAGE_SIZE):
+    """One keyset page of (key..., *row) tuples, in key order (see page_query)"""
+    if key is CTID_KEY:
+        cur.execute(RELATION_BLOCKS_QUERY, [sql.Identifier(table).as_string(cur)])
+        blocks = cur.fetchone()[0]
+        for window in ctid_windows(boundary, forward, blocks):
+            cur.execute(*page_query(table, key, boundary, forward, page_size, window))
+            rows = cur.fetchall()
+            if len(rows) >= page_size:
+                break
+    else:
+        cur.execute(*page_query(table, key, boundary, forward, page_size))
         rows = cur.fetchall()
-        if not rows:
-            print(f"Table '{real_name}' is empty.")
+    return rows if forward or key is None else rows[::-1]
+
+
+def stream_rows(conn, table, itersize=ITERSIZE):
+    """Yield every row of table through a named (server-side) cursor.
+
+    Only itersize rows are held client-side at a time, whatever the table
+    size. Must run inside a transaction (the default for psycopg
+    connections).
+    """
+    with conn.cursor(name=f"stream_{table}") as cur:
+        cur.itersize = itersize
+        cur.execute(sql.SQL('SELECT * FROM {}').format(sql.Identifier(table)))
+        yield from cur
+
+
+def export_query(table, fmt='csv'):
+    """COPY ... TO STDOUT of a whole table as csv (with header) or ndjson.
+
+    Both go through a SELECT, since views and partitioned tables cannot be
+    copied directly.
+    """
+    if fmt == 'csv':
+        query = sql.SQL('COPY (SELECT * FROM {}) TO STDOUT (FORMAT csv, HEADER)').format(sql.Identifier(table))
+    elif fmt == 'ndjson':
+        # CSV with quote/delimiter characters that never occur in JSON text
+        # (row_to_json escapes control characters), so each line is the raw object
+        query = sql.SQL(
+            "COPY (SELECT row_to_json(t) FROM {} t) TO STDOUT (FORMAT csv, QUOTE e'\\x01', DELIMITER e'\\x02')"
+        ).format(sql.Identifier(table))
+    else:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {EXPORT_FORMATS}")
+    return query
+
+
+def export_table(cur, table, out, fmt='csv'):
+    """Write table to the binary file object out with COPY ... TO STDOUT.
+
+    Data is written as the server sends it, so memory use stays constant.
+    Returns the number of rows exported.
+    """
+    with cur.copy(export_query(table, fmt)) as copy:
+        for data in copy:
+            out.write(data)
+    return cur.rowcount
+
+
+def _browse(cur, catalog, real_name, page_size, itersize):
+    info = catalog.table(cur, real_name)
+    key = paging_key(info.primary_key, info.kind)
+    skip = len(key[0]) if key is not None else 0
+    offset = 0
+    rows = fetch_page(cur, real_name, key, page_size=page_size)
+    if not rows:
+        print(f"Table '{real_name}' is empty.")
+        return
+    _print_rows_with_header(cur, rows, skip)
+
+    while True:
+        choice = input("[n]ext page, [p]revious page, [s]tream all, [e]xport, [b]ack: ").strip().lower()
+        if choice in ('n', 'next', 'p', 'prev', 'previous'):
+            forward = choice.startswith('n')
+            if key is not None:
+                boundary = rows[-1][:skip] if forward else rows[0][:skip]
+            else:
+                boundary = offset + page_size if forward else offset - page_size
+                if boundary < 0:
+                    print("Already at the first page.")
+                    continue
+            page = fetch_page(cur, real_name, key, boundary, forward, page_size)
+            if not page:
+                print("No more rows." if forward else "Already at the first page.")
+                continue
+            rows = page
+            if key is None:
+                offset = boundary
+            _print_rows_with_header(cur, rows, skip)
+        elif choice in ('s', 'stream'):
+            count = 0
+            for row in stream_rows(cur.connection, real_name, itersize):
+                print(row)
+                count += 1
+            print(f"{count} row(s).")
+        elif choice in ('e', 'export'):
+            fmt = input(f"Format ({'/'.join(EXPORT_FORMATS)}) [csv]: ").strip().lower() or 'csv'
+            if fmt not in EXPORT_FORMATS:
+                print("Unknown format.")
+                continue
+            path = input(f"Output file [{real_name}.{fmt}]: ").strip() or f"{real_name}.{fmt}"
+            with open(path, 'wb') as out:
+                count = export_table(cur, real_name, out, fmt)
+            print(f"Exported {count} row(s) to {path}")
+        elif choice in ('', 'b', 'back', 'q', 'quit'):
+            return
         else:
-            _print_rows_with_header(cur, rows)
+            print("Invalid choice, please try again.")
+
+
+def show_table(cur, catalog, page_size=PAGE_SIZE, itersize=ITERSIZE):
+    tbl = input("Enter table name: ").strip()
+    lookup = {name.lower(): name for name in catalog.table_names(cur)}
+    if tbl.lower() in lookup:
+        _browse(cur, catalog, lookup[tbl.lower()], page_size, itersize)
     else:
         print("Table not found in the database")
-
@@ -0,0 +1,280 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import math
+import os
+import time
+
+from psycopg import pq, sql
+from psycopg_pool import AsyncConnectionPool
+
+from batch import CONNECT_TIMEOUT, load_catalog, run_async
+
+SNAPSHOT_FORMATS = ('csv', 'binary')
+CHUNK_ROWS = 1000000
+COMPRESS_LEVEL = 1
+WRITE_BUFFER = 1 << 20
+INTEGER_TYPES = ('smallint', 'integer', 'bigint')
+MANIFEST = 'manifest.json'
+
+
+class _HashingFile:
+    """Binary file that keeps a sha256 and byte count of everything written"""
+
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def snapshot_query(table, fmt='csv', condition=None, kind='r'):
+    """COPY ... TO STDOUT of table, or of the rows matching condition.
+
+    Only plain tables (kind 'r') can be copied directly; partitioned tables
+    are read through a SELECT, which also covers their partitions.
+    """
+    if fmt == 'csv':
+        options = sql.SQL('(FORMAT csv, HEADER)')
+    elif fmt == 'binary':
+        options = sql.SQL('(FORMAT binary)')
+    else:
+        raise ValueError(f"Unknown snapshot format {fmt!r}; expected one of {SNAPSHOT_FORMATS}")
+    if condition is None and kind == 'r':
+        return sql.SQL('COPY {} TO STDOUT {}').format(sql.Identifier(table), options)
+    if condition is None:
+        return sql.SQL('COPY (SELECT * FROM {}) TO STDOUT {}').format(sql.Identifier(table), options)
+    return sql.SQL('COPY (SELECT * FROM {} WHERE {}) TO STDOUT {}').format(
+        sql.Identifier(table), condition, options
+    )
+
+
+def _tid(block):
+    return sql.SQL('{}::tid').format(sql.Literal(f"({block},0)"))
+
+
+def ctid_chunks(pages, chunks):
+    """(condition, range) pairs splitting a heap of pages into block ranges.
+
+    Each range is a TID range scan (PostgreSQL 14+), so chunks read
+    disjoint parts of the table without needing an index. The last range is
+    open-ended and also covers pages added after the size was taken.
+    """
+    step = max(1, math.ceil(pages / chunks))
+    result = []
+    for start in range(0, max(pages, 1), step):
+        end = start + step
+        if end >= pages:
+            result.append((sql.SQL('ctid >= {}').format(_tid(start)), {'ctid_blocks': [start, None]}))
+            break
+        result.append((sql.SQL('ctid >= {} AND ctid < {}').format(_tid(start), _tid(end)),
+                       {'ctid_blocks': [start, end]}))
+    return result
+
+
+def key_chunks(column, low, high, chunks):
+    """(condition, range) pairs splitting an integer key from low to high.
+
+    The first and last ranges are open-ended so no row is missed.
+    """
+    step = max(1, math.ceil((high - low + 1) / chunks))
+    key = sql.Identifier(column)
+    result = []
+    for start in range(low, high + 1, step):
+        end = start + step
+        if start == low and end > high:
+            return [(None, None)]
+        if start == low:
+            condition = sql.SQL('{} < {}').format(key, sql.Literal(end))
+        elif end > high:
+            condition = sql.SQL('{} >= {}').format(key, sql.Literal(start))
+        else:
+            condition = sql.SQL('{} >= {} AND {} < {}').format(key, sql.Literal(start), key, sql.Literal(end))
+        result.append((condition, {column: [None if start == low else start, None if end > high else end]}))
+    return result
+
+
+async def plan_table(cur, info, chunk_rows):
+    """Split one table into (condition, range) chunks of about chunk_rows rows.
+
+    Plain tables are split by ctid block ranges, partitioned tables (whose
+    ctids are not unique) by a single integer primary key; anything else is
+    exported in one piece.
+    """
+    chunks = math.ceil(info.estimated_rows / chunk_rows) if chunk_rows > 0 else 1
+    if chunks <= 1:
+        return [(None, None)]
+    if info.kind == 'r':
+        await cur.execute("SELECT pg_relation_size(%s::regclass) / current_setting('block_size')::int",
+                          [sql.Identifier(info.name).as_string(cur)])
+        pages = (await cur.fetchone())[0]
+        return ctid_chunks(pages, chunks)
+    if len(info.primary_key) == 1 and info.columns.get(info.primary_key[0]) in INTEGER_TYPES:
+        column = info.primary_key[0]
+        await cur.execute(sql.SQL('SELECT min({0}), max({0}) FROM {1}').format(
+            sql.Identifier(column), sql.Identifier(info.name)))
+        low, high = await cur.fetchone()
+        if low is not None:
+            return key_chunks(column, low, high, chunks)
+    return [(None, None)]
+
+
+async def _begin_snapshot(conn, snapshot_id=None):
+    await conn.set_autocommit(True)
+    await conn.execute("BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY")
+    if snapshot_id is not None:
+        await conn.execute(sql.SQL('SET TRANSACTION SNAPSHOT {}').format(sql.Literal(snapshot_id)))
+
+
+async def _end_snapshot(conn):
+    if conn.info.transaction_status != pq.TransactionStatus.IDLE:
+        await conn.execute("ROLLBACK")
+    await conn.set_autocommit(False)
+
+
+async def export_chunk(pool, snapshot_id, query, path, compress_level=None):
+    """COPY one chunk to path inside the shared snapshot; returns its manifest entry.
+
+    Writes (and gzip compression, which releases the GIL) run in worker
+    threads in WRITE_BUFFER pieces so they overlap with the other
+    connections' transfers.
+    """
+    async with pool.connection() as conn:
+        try:
+            await _begin_snapshot(conn, snapshot_id)
+            raw = _HashingFile(path)
+            try:
+                out = raw
+                if compress_level is not None:
+                    out = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=compress_level, mtime=0)
+                buffer = bytearray()
+                async with conn.cursor() as cur:
+                    async with cur.copy(query) as copy:
+                        async for data in copy:
+                            buffer += data
+                            if len(buffer) >= WRITE_BUFFER:
+                                await asyncio.to_thread(out.write, bytes(buffer))
+                                buffer.clear()
+                    rows = cur.rowcount
+                if buffer:
+                    await asyncio.to_thread(out.write, bytes(buffer))
+                if out is not raw:
+                    await asyncio.to_thread(out.close)
+            finally:
+                raw.close()
+            await conn.execute("COMMIT")
+        finally:
+            await _end_snapshot(conn)
+    return {'file': os.path.basename(path), 'rows': rows, 'bytes': raw.size, 'sha256': raw.sha256.hexdigest()}
+
+
+async def _snapshot(conn_str, catalog, args):
+    compress_level = args.compress_level if args.compress else None
+    extension = ('csv' if args.format == 'csv' else 'bin') + ('.gz' if args.compress else '')
+    limit = asyncio.Semaphore(args.concurrency)
+    # One extra connection holds the exported snapshot open for the whole run
+    async with AsyncConnectionPool(conn_str, min_size=1, max_size=args.concurrency + 1, open=False) as pool:
+        await pool.wait(timeout=CONNECT_TIMEOUT)
+        await load_catalog(pool, catalog)
+        tables = [t for t in catalog.tables.values() if t.kind in ('r', 'p')]
+        if args.tables:
+            wanted = {name.lower() for name in args.tables}
+            tables = [t for t in tables if t.name.lower() in wanted]
+            missing = wanted - {t.name.lower() for t in tables}
+            for name in sorted(missing):
+                print(f"{name}: Table not found in the database")
+            if missing:
+                return 1
+        else:
+            # A partitioned table's COPY already includes its partitions' rows
+            tables = [t for t in tables if not t.partition]
+        os.makedirs(args.out_dir, exist_ok=True)
+
+        async with pool.connection() as coordinator:
+            try:
+                await _begin_snapshot(coordinator)
+                async with coordinator.cursor() as cur:
+                    await cur.execute("SELECT pg_export_snapshot()")
+                    snapshot_id = (await cur.fetchone())[0]
+                    # Planned inside the snapshot, so key ranges match the exported data
+                    plans = {t.name: await plan_table(cur, t, args.chunk_rows) for t in tables}
+
+                jobs = []
+                for info in tables:
+                    for index, (condition, key_range) in enumerate(plans[info.name]):
+                        path = os.path.join(args.out_dir, f"{info.name}.{index:04d}.{extension}")
+                        weight = info.estimated_rows / len(plans[info.name])
+                        jobs.append((weight, info.name, index, key_range,
+                                     snapshot_query(info.name, args.format, condition, info.kind), path))
+                # Largest chunks first, so a big table does not start last and run alone
+                jobs.sort(key=lambda job: -job[0])
+
+                async def run_job(query, path):
+                    async with limit:
+                        return await export_chunk(pool, snapshot_id, query, path, compress_level)
+
+                print(f"Exporting {len(tables)} table(s) in {len(jobs)} chunk(s) "
+                      f"on up to {args.concurrency} connection(s)")
+                started = time.perf_counter()
+                results = await asyncio.gather(*(run_job(query, path)
+                                                 for _, _, _, _, query, path in jobs),
+                                               return_exceptions=True)
+                elapsed = time.perf_counter() - started
+            finally:
+                await _end_snapshot(coordinator)
+
+    manifest_tables = {t.name: {'rows': 0, 'bytes': 0, 'chunks': []} for t in tables}
+    errors = []
+    for (_, table, index, key_range, _, path), result in sorted(zip(jobs, results), key=lambda r: r[0][1:3]):
+        if isinstance(result, BaseException):
+            print(f"{os.path.basename(path)}: Error: {result}")
+            errors.append({'table': table, 'chunk': index, 'error': str(result)})
+            continue
+        result['range'] = key_range
+        entry = manifest_tables[table]
+        entry['chunks'].append(result)
+        entry['rows'] += result['rows']
+        entry['bytes'] += result['bytes']
+    rows = sum(t['rows'] for t in manifest_tables.values())
+    size = sum(t['bytes'] for t in manifest_tables.values())
+
+    manifest = {
+        'database': catalog.database,
+        'snapshot': snapshot_id,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'format': args.format,
+        'compression': 'gzip' if args.compress else None,
+        'rows': rows,
+        'bytes': size,
+        'seconds': elapsed,
+        'tables': manifest_tables,
+        'errors': errors,
+    }
+    with open(os.path.join(args.out_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    rate = f"{rows / elapsed:.0f} rows/s, {size / elapsed / 1e6:.1f} MB/s" if elapsed else "n/a"
+    print(f"{len(jobs) - len(errors)} of {len(jobs)} chunk(s) done: {rows} row(s), {size} byte(s) "
+          f"in {elapsed:.2f}s ({rate}); manifest written to {os.path.join(args.out_dir, MANIFEST)}")
+    return 1 if errors else 0
+
+
+def run_snapshot(conn_str, catalog, args):
+    """Export every table from one consistent snapshot; returns the process exit code.
+
+    All worker connections import the same exported snapshot
+    (pg_export_snapshot), so the chunk files together form a consistent
+    copy of the schema even while it is being written to.
+    """
+    return run_async(_snapshot(conn_str, catalog, args))
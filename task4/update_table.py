@@ -1,5 +1,12 @@
+import csv
+import sys
+import time
+
 from psycopg import sql
 
+BULK_BATCH_SIZE = 100000
+STAGE_TABLE = '_bulk_update_stage'
+
 
 def _print_rows_with_header(cur, rows):
     if cur.description:
@@ -10,9 +17,183 @@ def _print_rows_with_header(cur, rows):
         print(r)
 
 
-def update_table(cur, table_names):
+def stage_queries(table, key_cols):
+    """Statements creating the temporary staging table for a bulk update.
+
+    It holds the key columns (typed like the target's, or row_ctid), the
+    column name, its new value as text, and the input order in _seq.
+    """
+    stage = sql.Identifier(STAGE_TABLE)
+    if key_cols:
+        create = sql.SQL('CREATE TEMP TABLE {} ON COMMIT DELETE ROWS AS SELECT {} FROM {} WITH NO DATA').format(
+            stage,
+            sql.SQL(', ').join(sql.Identifier(c) for c in key_cols),
+            sql.Identifier(table),
+        )
+    else:
+        create = sql.SQL('CREATE TEMP TABLE {} (row_ctid tid) ON COMMIT DELETE ROWS').format(stage)
+    return [
+        drop_stage_query(),
+        create,
+        sql.SQL('ALTER TABLE {} ADD COLUMN _column text, ADD COLUMN _value text, '
+                'ADD COLUMN _seq bigserial').format(stage),
+    ]
+
+
+def drop_stage_query():
+    return sql.SQL('DROP TABLE IF EXISTS {}').format(sql.Identifier(STAGE_TABLE))
+
+
+def stage_copy_query(key_cols):
+    return sql.SQL('COPY {} ({}) FROM STDIN').format(
+        sql.Identifier(STAGE_TABLE),
+        sql.SQL(', ').join(sql.Identifier(c) for c in (key_cols or ['row_ctid']) + ['_column', '_value']),
+    )
+
+
+def update_query(table, key_cols, columns, types):
+    """One UPDATE ... FROM applying every staged change to the given columns.
+
+    Changes are pivoted to one row per key, so a target row gets a single
+    new version however many of its columns change; for repeated
+    (key, column) pairs the last one in the input wins.
+    """
+    stage_keys = [sql.Identifier(c) for c in key_cols] or [sql.Identifier('row_ctid')]
+    picks = []
+    sets = []
+    for i, col in enumerate(columns):
+        value, present = sql.Identifier(f"v{i}"), sql.Identifier(f"h{i}")
+        picks.append(sql.SQL('(array_agg(_value ORDER BY _seq DESC) FILTER (WHERE _column = {col}))[1] AS {value}, '
+                             'bool_or(_column = {col}) AS {present}').format(
+            col=sql.Literal(col), value=value, present=present))
+        sets.append(sql.SQL('{col} = CASE WHEN s.{present} THEN s.{value}::{type} ELSE t.{col} END').format(
+            col=sql.Identifier(col), present=present, value=value, type=sql.SQL(types[col])))
+    if key_cols:
+        match = sql.SQL(' AND ').join(sql.SQL('t.{0} = s.{0}').format(sql.Identifier(c)) for c in key_cols)
+    else:
+        match = sql.SQL('t.ctid = s.row_ctid')
+    return sql.SQL('UPDATE {table} t SET {sets} FROM (SELECT {keys}, {picks} FROM {stage} GROUP BY {keys}) s '
+                   'WHERE {match}').format(
+        table=sql.Identifier(table),
+        sets=sql.SQL(', ').join(sets),
+        keys=sql.SQL(', ').join(stage_keys),
+        picks=sql.SQL(', ').join(picks),
+        stage=sql.Identifier(STAGE_TABLE),
+        match=match,
+    )
+
+
+class ChangeBatches:
+    """Batches of validated (key..., column, value) rows from a changes CSV.
+
+    The header must name the key column(s) followed by `column` and `value`:
+    the primary key columns, or `ctid` for a table without one. A value of
+    NULL becomes None. Lines with the wrong width, an unknown column or a
+    key column are skipped and counted in rejected. Iterating yields
+    (rows, columns) per batch of up to batch_size rows.
+    """
+
+    def __init__(self, source, pk_cols, types, batch_size=BULK_BATCH_SIZE):
+        self.reader = csv.reader(source)
+        self.pk_cols = pk_cols
+        self.types = types
+        self.batch_size = batch_size
+        self.rejected = 0
+        expected = (pk_cols or ['ctid']) + ['column', 'value']
+        header = next(self.reader, None)
+        if header is None or [h.strip() for h in header] != expected:
+            raise ValueError(f"Expected CSV header: {','.join(expected)}")
+        self.width = len(expected)
+
+    def __iter__(self):
+        rows = []
+        columns = set()
+        for row in self.reader:
+            if len(row) != self.width or row[-2] not in self.types or row[-2] in self.pk_cols:
+                self.rejected += 1
+                continue
+            value = None if row[-1].upper() == 'NULL' else row[-1]
+            rows.append(row[:-1] + [value])
+            columns.add(row[-2])
+            if len(rows) >= self.batch_size:
+                yield rows, sorted(columns)
+                rows = []
+                columns = set()
+        if rows:
+            yield rows, sorted(columns)
+
+
+def batch_stats(number, changes, updated, started, copied, finished, table=None):
+    prefix = f"{table}: " if table else ""
+    stats = {
+        'batch': number,
+        'changes': changes,
+        'rows_updated': updated,
+        'copy_seconds': copied - started,
+        'update_seconds': finished - copied,
+    }
+    print(f"{prefix}Batch {number}: {changes} change(s), {updated} row(s) updated "
+          f"(copy {stats['copy_seconds']:.2f}s, update {stats['update_seconds']:.2f}s)")
+    return stats
+
+
+def report_bulk_update(batches, rejected, table=None):
+    prefix = f"{table}: " if table else ""
+    total = sum(b['rows_updated'] for b in batches)
+    print(f"{prefix}Applied {sum(b['changes'] for b in batches)} change(s) in {len(batches)} batch(es), "
+          f"{total} row(s) updated, {rejected} line(s) rejected (bad width, unknown or key column).")
+
+
+def bulk_update(cur, catalog, table, source, batch_size=BULK_BATCH_SIZE):
+    """Apply (key, column, value) changes from a CSV file object to table.
+
+    See ChangeBatches for the input format. Each batch is loaded with COPY
+    into a temporary staging table, applied with one set-based
+    UPDATE ... FROM and committed. Returns the list of per-batch stats.
+    """
+    pk_cols = catalog.primary_key(cur, table)
+    types = catalog.column_types(cur, table)
+    try:
+        changes = ChangeBatches(source, pk_cols, types, batch_size)
+    except ValueError as e:
+        print(e)
+        return []
+
+    for query in stage_queries(table, pk_cols):
+        cur.execute(query)
+    copy_query = stage_copy_query(pk_cols)
+    batches = []
+    for rows, columns in changes:
+        started = time.perf_counter()
+        with cur.copy(copy_query) as copy:
+            for row in rows:
+                copy.write_row(row)
+        copied = time.perf_counter()
+        cur.execute(update_query(table, pk_cols, columns, types))
+        updated = cur.rowcount
+        cur.connection.commit()
+        batches.append(batch_stats(len(batches) + 1, len(rows), updated, started, copied, time.perf_counter()))
+
+    cur.execute(drop_stage_query())
+    report_bulk_update(batches, changes.rejected)
+    return batches
+
+
+def _bulk_update_prompt(cur, catalog, table):
+    path = input("CSV file of changes ('-' for stdin): ").strip()
+    if path == '-':
+        bulk_update(cur, catalog, table, sys.stdin)
+        return
+    try:
+        with open(path, newline='') as f:
+            bulk_update(cur, catalog, table, f)
+    except OSError as e:
+        print(f"Cannot read {path}: {e}")
+
+
+def update_table(cur, catalog):
     tbl = input("Enter table name: ").strip()
-    lookup = {name.lower(): name for name in table_names}
+    lookup = {name.lower(): name for name in catalog.table_names(cur)}
     if tbl.lower() not in lookup:
         print("Table not found in the database")
         return
@@ -30,10 +211,13 @@ def update_table(cur, table_names):
         preview = row[1:6]
         print(f"{idx}. {preview}")
 
-    sel = input("Enter row number to update (or 'c' to cancel): ").strip()
+    sel = input("Enter row number to update, 'b' for a bulk update from CSV (or 'c' to cancel): ").strip()
     if sel.lower() in ('c', 'cancel'):
         print("Cancelled update.")
         return
+    if sel.lower() in ('b', 'bulk'):
+        _bulk_update_prompt(cur, catalog, real_name)
+        return
 
     try:
         sel_idx = int(sel)
@@ -46,21 +230,7 @@ def update_table(cur, table_names):
 
     chosen = rows[sel_idx - 1]
 
-    cur.execute(
-        """
-        SELECT kcu.column_name
-        FROM information_schema.table_constraints tc
-        JOIN information_schema.key_column_usage kcu
-          ON tc.constraint_name = kcu.constraint_name
-         AND tc.table_schema = kcu.table_schema
-        WHERE tc.constraint_type = 'PRIMARY KEY'
-          AND tc.table_name = %s
-          AND tc.table_schema = 'public'
-        ORDER BY kcu.ordinal_position;
-        """,
-        (real_name,)
-    )
-    pk_cols = [r[0] for r in cur.fetchall()]
+    pk_cols = catalog.primary_key(cur, real_name)
 
     col_names = desc[1:]
     values = list(chosen[1:])